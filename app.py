@@ -2,7 +2,7 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from config import Config
 
-def create_app():
+def create_app(config_overrides=None):
     app = Flask(__name__)
     app.config.from_object(Config)
     
@@ -10,9 +10,38 @@ def create_app():
     app.config['SECRET_KEY'] = 'habithero-secret-key-2024'
     app.config['SESSION_TYPE'] = 'filesystem'
     
+    # Used by benchmarks and scripts to point the app at another database
+    if config_overrides:
+        app.config.update(config_overrides)
+    
     # Initialize extensions - import here to avoid circular imports
     from models import db
+    from services.sqliteService import configure_engine_options, init_sqlite
+    from services.replicaService import init_replica
+    configure_engine_options(app)
     db.init_app(app)
+    init_replica(app)
+    init_sqlite(app)
+    
+    from services.jsonService import init_json
+    init_json(app)
+    
+    from services.cacheService import init_cache, get_cache
+    init_cache(app)
+    
+    from services.tokenService import init_tokens
+    init_tokens(app)
+    
+    from services.passwordService import init_password_pool
+    init_password_pool(app)
+    
+    if app.config.get('METRICS_ENABLED'):
+        from services.metricsService import init_metrics, metrics_response
+        init_metrics(app)
+        
+        @app.route('/api/metrics')
+        def metrics():
+            return metrics_response(app)
     
     CORS(app, origins=["http://localhost:5173"], supports_credentials=True)
     
@@ -28,9 +57,23 @@ def create_app():
     def health_check():
         return jsonify({'success': True, 'message': 'Server is running'})
     
-    # Create tables
+    @app.route('/api/cache/stats')
+    def cache_stats():
+        cache = get_cache()
+        return jsonify({'success': True, 'cache': cache.stats() if cache else None})
+    
+    # Create tables and bring existing databases up to date
+    from models.migrations import upgrade_schema
     with app.app_context():
         db.create_all()
+        upgrade_schema()
+    
+    from commands import register_commands
+    register_commands(app)
+    
+    # Started last so the job_locks table exists before the first check
+    from services.nightlyService import init_scheduler
+    init_scheduler(app)
     
     return app
 
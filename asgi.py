@@ -0,0 +1,7 @@
+# ASGI entry point, e.g. `uvicorn asgi:app --port 5000`. The handlers stay
+# synchronous: asgiref runs each request on a worker thread, so this only lets an
+# ASGI server host the API and is no faster than the threaded WSGI server.
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+
+app = WsgiToAsgi(create_app())
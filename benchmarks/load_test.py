@@ -0,0 +1,213 @@
+"""Concurrent load test: the threaded WSGI server versus the ASGI entry point.
+
+Seeds a synthetic dataset, then runs the same request mix from N concurrent
+clients against (a) the Flask app served one thread per connection, as by
+`python app.py` / `flask run` (Werkzeug's threaded server), and (b) the same app
+behind asgiref's WsgiToAsgi, as in asgi.py, driven in-process on an asyncio loop.
+Reports throughput, latency percentiles and status codes per mode. The handlers
+are synchronous in both modes, so expect no gain from ASGI.
+
+    python -m benchmarks.load_test --clients 16 --requests 800
+    python -m benchmarks.load_test --mode asgi --json load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.run_benchmarks import percentile
+from benchmarks.seed import BENCH_PASSWORD, bench_email, seed_dataset
+
+# (method, path, json body); logins exercise the password hashing pool
+REQUEST_MIX = [
+    ('GET', '/api/habits', None),
+    ('GET', '/api/habits/today', None),
+    ('GET', '/api/habits/analytics', None),
+    ('GET', '/api/habits/calendar', None),
+    ('GET', '/api/habits/daily-success?days=30', None),
+    ('GET', '/api/habits/completed-today', None),
+    ('GET', '/api/habits/checkins?limit=100', None),
+    ('GET', '/api/auth/me', None),
+    ('POST', '/api/auth/login', {'email': bench_email(1), 'password': BENCH_PASSWORD}),
+]
+
+def build_scope(method, path, headers, body):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': query.encode('latin-1'),
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+                   + [(b'content-length', str(len(body)).encode('latin-1'))],
+        'server': ('localhost', 5000),
+        'client': ('127.0.0.1', 50000)
+    }
+
+def encode_request(request, cookie):
+    method, path, payload = request
+    headers = [('Cookie', cookie)]
+    body = b''
+    if payload is not None:
+        body = json.dumps(payload).encode('utf-8')
+        headers.append(('Content-Type', 'application/json'))
+    return method, path, headers, body
+
+def summarize(mode, clients, latencies, statuses, elapsed):
+    return {
+        'mode': mode,
+        'clients': clients,
+        'requests': len(latencies),
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+def run_wsgi(flask_app, cookie, clients, total):
+    # Each client thread calls the app directly, like the threaded development
+    # server handling every connection on its own thread
+    from werkzeug.test import EnvironBuilder
+
+    latencies = []
+    statuses = {}
+    results_lock = threading.Lock()
+    remaining = iter(range(total))
+
+    def client():
+        while True:
+            with results_lock:
+                index = next(remaining, None)
+            if index is None:
+                return
+            method, path, headers, body = encode_request(REQUEST_MIX[index % len(REQUEST_MIX)], cookie)
+            environ = EnvironBuilder(path=path, method=method, headers=headers, data=body).get_environ()
+            status = {}
+
+            def start_response(status_line, response_headers, exc_info=None):
+                status['code'] = int(status_line.split(' ', 1)[0])
+
+            started = time.perf_counter()
+            response = flask_app(environ, start_response)
+            try:
+                for _ in response:
+                    pass
+            finally:
+                if hasattr(response, 'close'):
+                    response.close()
+            latency = (time.perf_counter() - started) * 1000
+            with results_lock:
+                latencies.append(latency)
+                statuses[status['code']] = statuses.get(status['code'], 0) + 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize('wsgi-threaded', clients, latencies, statuses, time.perf_counter() - started)
+
+async def asgi_call(asgi_app, method, path, headers, body):
+    delivered = False
+    response = {}
+
+    async def receive():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+
+    await asgi_app(build_scope(method, path, headers, body), receive, send)
+    return response['status']
+
+def run_asgi(asgi_app, cookie, clients, total):
+    latencies = []
+    statuses = {}
+    remaining = iter(range(total))
+
+    async def client():
+        for index in remaining:
+            method, path, headers, body = encode_request(REQUEST_MIX[index % len(REQUEST_MIX)], cookie)
+            started = time.perf_counter()
+            status = await asgi_call(asgi_app, method, path, headers, body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    async def run_clients():
+        await asyncio.gather(*(client() for _ in range(clients)))
+
+    started = time.perf_counter()
+    asyncio.run(run_clients())
+    return summarize('asgi', clients, latencies, statuses, time.perf_counter() - started)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--habits', type=int, default=20, help='habits per user')
+    parser.add_argument('--days', type=int, default=180, help='days of check-in history')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=450, help='requests per mode')
+    parser.add_argument('--mode', choices=('both', 'wsgi', 'asgi'), default='both')
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    from asgiref.wsgi import WsgiToAsgi
+    from app import create_app
+    from models import User
+
+    workdir = tempfile.mkdtemp(prefix='habithero-load-')
+    flask_app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(workdir, 'load.db'),
+        'CACHE_BACKEND': 'null'
+    })
+    asgi_app = WsgiToAsgi(flask_app)
+
+    with flask_app.app_context():
+        dataset = seed_dataset(args.users, args.habits, args.days)
+        User.query.filter_by(email=bench_email(0)).one()
+
+    client = flask_app.test_client()
+    response = client.post('/api/auth/login', json={'email': bench_email(0), 'password': BENCH_PASSWORD})
+    if response.status_code != 200:
+        raise RuntimeError(f'Load test login failed: {response.get_json()}')
+    cookie = f"session={client.get_cookie('session').value}"
+
+    results = []
+    if args.mode in ('both', 'wsgi'):
+        results.append(run_wsgi(flask_app, cookie, args.clients, args.requests))
+    if args.mode in ('both', 'asgi'):
+        results.append(run_asgi(asgi_app, cookie, args.clients, args.requests))
+
+    if args.json != '-':
+        for result in results:
+            print(f"{result['mode']:<10} clients {result['clients']:>3}  {result['throughput_rps']:>8.1f} req/s  "
+                  f"p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                  f"p99 {result['p99_ms']:>9.2f}ms  {result['status_codes']}")
+
+    report = {'dataset': dataset, 'parameters': vars(args), 'results': results}
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    elif args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+if __name__ == '__main__':
+    main()
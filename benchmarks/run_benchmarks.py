@@ -0,0 +1,273 @@
+"""Endpoint benchmarks for the habit and auth blueprints.
+
+Seeds a synthetic dataset into a temporary SQLite database, drives every route
+through the Flask test client and reports latency percentiles, SQL query counts
+and peak Python memory per endpoint.
+
+    python -m benchmarks.run_benchmarks --users 20 --habits 40 --days 365
+    python -m benchmarks.run_benchmarks --json results.json
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import event
+
+from benchmarks.seed import BENCH_PASSWORD, bench_email, seed_dataset
+from services.scheduleService import day_start
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+# Endpoints that replace the client's session; the benchmark user logs back in after each call
+SESSION_SCENARIOS = ('POST /api/auth/login', 'POST /api/auth/register', 'POST /api/auth/logout')
+# Endpoints that hash a password run fewer iterations (--auth-iterations)
+HASHING_SCENARIOS = ('POST /api/auth/login', 'POST /api/auth/register')
+
+def build_scenarios(app, habit_ids):
+    # Each scenario is (name, method, path factory, body factory). Factories get
+    # the iteration number so mutating endpoints can target fresh rows. A body
+    # factory returns a dict (sent as JSON) or a string (sent as NDJSON).
+    from models import db, Habit
+    from services.tokenService import REFRESH, issue_token
+
+    today = datetime.date.today()
+    counter = itertools.count()
+    registered = itertools.count()
+
+    reserved = {}
+
+    def reserved_habit(kind, i, count=200):
+        # Habits for mark-done and delete, created on first use (during warmup) so
+        # they don't inflate the read benchmarks that run earlier
+        if kind not in reserved:
+            with app.app_context():
+                user_id = db.session.get(Habit, habit_ids[0]).user_id
+                habits = [
+                    Habit(user_id=user_id, name=f'Reserved {kind} {index}', frequency='daily', category='health',
+                          start_date=day_start(today),
+                          target_duration=30, note='')
+                    for index in range(count)
+                ]
+                db.session.add_all(habits)
+                db.session.commit()
+                reserved[kind] = [habit.id for habit in habits]
+        return reserved[kind][i % count]
+
+    def bulk_body(i):
+        day = today - datetime.timedelta(days=next(counter) % 30)
+        return {'checkins': [{'habit_id': habit_id, 'date': day.isoformat()} for habit_id in habit_ids[:20]]}
+
+    def import_body(i):
+        # One habit with a month of completed check-ins per call
+        start = today - datetime.timedelta(days=29)
+        records = [{'type': 'habit', 'ref': 'h', 'name': f'Imported {i}', 'frequency': 'daily', 'category': 'health',
+                    'start_date': start.isoformat(), 'target_duration': 30}]
+        records += [{'type': 'checkin', 'ref': 'h', 'date': (start + datetime.timedelta(days=offset)).isoformat()}
+                    for offset in range(30)]
+        return '\n'.join(json.dumps(record) for record in records)
+
+    def refresh_body(i):
+        # Refresh tokens are single use, so every call presents a new one
+        with app.app_context():
+            return {'refresh_token': issue_token(REFRESH, db.session.get(Habit, habit_ids[0]).user)}
+
+    return [
+        ('GET /api/habits', 'GET', lambda i: '/api/habits', None),
+        ('GET /api/habits?limit=50', 'GET', lambda i: '/api/habits?limit=50', None),
+        ('GET /api/habits/today', 'GET', lambda i: '/api/habits/today', None),
+        ('GET /api/habits/completed-today', 'GET', lambda i: '/api/habits/completed-today', None),
+        ('GET /api/habits/failed-today', 'GET', lambda i: '/api/habits/failed-today', None),
+        ('GET /api/habits/analytics', 'GET', lambda i: '/api/habits/analytics', None),
+        ('GET /api/habits/calendar', 'GET', lambda i: '/api/habits/calendar', None),
+        ('GET /api/habits/calendar?mode=heatmap', 'GET', lambda i: '/api/habits/calendar?mode=heatmap', None),
+        ('GET /api/habits/calendar?mode=heatmap&by_habit', 'GET',
+         lambda i: '/api/habits/calendar?mode=heatmap&by_habit=true', None),
+        ('GET /api/habits/daily-success', 'GET', lambda i: '/api/habits/daily-success', None),
+        ('GET /api/habits/daily-success?days=365', 'GET', lambda i: '/api/habits/daily-success?days=365', None),
+        ('GET /api/habits/by-category', 'GET', lambda i: '/api/habits/by-category?category=health', None),
+        ('GET /api/habits/checkins', 'GET', lambda i: '/api/habits/checkins?limit=100', None),
+        ('GET /api/habits/motivational-quote', 'GET', lambda i: '/api/habits/motivational-quote', None),
+        ('GET /api/habits/export', 'GET', lambda i: '/api/habits/export', None),
+        ('GET /api/habits/export?format=csv', 'GET', lambda i: '/api/habits/export?format=csv', None),
+        ('POST /api/habits', 'POST', lambda i: '/api/habits', lambda i: {
+            'name': f'Bench {i}', 'frequency': 'daily', 'category': 'health',
+            'start_date': today.isoformat(), 'target_duration': 30
+        }),
+        ('POST /api/habits/mark-done', 'POST', lambda i: '/api/habits/mark-done',
+         lambda i: {'habit_id': reserved_habit('mark', i)}),
+        ('POST /api/habits/checkins/bulk', 'POST', lambda i: '/api/habits/checkins/bulk', bulk_body),
+        ('POST /api/habits/import', 'POST', lambda i: '/api/habits/import', import_body),
+        ('DELETE /api/habits', 'DELETE', lambda i: f"/api/habits?habit_id={reserved_habit('delete', i)}", None),
+        ('GET /api/health', 'GET', lambda i: '/api/health', None),
+        ('GET /api/auth/me', 'GET', lambda i: '/api/auth/me', None),
+        ('PATCH /api/auth/me', 'PATCH', lambda i: '/api/auth/me', lambda i: {'timezone': ('UTC', None)[i % 2]}),
+        ('POST /api/auth/refresh', 'POST', lambda i: '/api/auth/refresh', refresh_body),
+        ('POST /api/auth/logout', 'POST', lambda i: '/api/auth/logout', None),
+        ('POST /api/auth/login', 'POST', lambda i: '/api/auth/login',
+         lambda i: {'email': bench_email(0), 'password': BENCH_PASSWORD}),
+        ('POST /api/auth/register', 'POST', lambda i: '/api/auth/register', lambda i: {
+            'name': 'New', 'email': f'new{next(registered)}@example.com',
+            'password': BENCH_PASSWORD, 'confirmPassword': BENCH_PASSWORD
+        }),
+    ]
+
+def run_scenario(client, queries, scenario, iterations, warmup):
+    name, method, path_for, body_for = scenario
+
+    def prepare(i):
+        body = body_for(i) if body_for else None
+        if isinstance(body, str):
+            return path_for(i), {'data': body, 'content_type': 'application/x-ndjson'}
+        return path_for(i), {'json': body} if body is not None else {}
+
+    def call(path, kwargs):
+        response = client.open(path, method=method, **kwargs)
+        # Streamed responses (exports) only do their work as the body is read
+        response.get_data()
+        return response
+
+    def restore_session():
+        if name in SESSION_SCENARIOS:
+            login(client)
+
+    for i in range(warmup):
+        call(*prepare(i))
+        restore_session()
+
+    latencies = []
+    query_counts = []
+    statuses = {}
+    for i in range(warmup, warmup + iterations):
+        request = prepare(i)
+        before = queries.count
+        started = time.perf_counter()
+        response = call(*request)
+        latencies.append((time.perf_counter() - started) * 1000)
+        query_counts.append(queries.count - before)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        restore_session()
+
+    # Peak memory in a separate traced call so tracing doesn't skew latencies
+    request = prepare(warmup + iterations)
+    tracemalloc.start()
+    call(*request)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    restore_session()
+
+    return {
+        'endpoint': name,
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries_avg': round(sum(query_counts) / len(query_counts), 2),
+        'queries_max': max(query_counts),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as handle:
+        baseline = {result['endpoint']: result for result in json.load(handle)['results']}
+
+    print(f"\n{'endpoint':<48} {'p50 change':>12} {'p95 change':>12} {'queries':>14}")
+    for result in results:
+        before = baseline.get(result['endpoint'])
+        if before is None:
+            continue
+        def change(key):
+            return (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        print(f"{result['endpoint']:<48} {change('p50_ms'):>+11.1f}% {change('p95_ms'):>+11.1f}% "
+              f"{before['queries_avg']:>6} -> {result['queries_avg']:<6}")
+
+def login(client):
+    response = client.post('/api/auth/login', json={'email': bench_email(0), 'password': BENCH_PASSWORD})
+    if response.status_code != 200:
+        raise RuntimeError(f'Benchmark login failed: {response.get_json()}')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--habits', type=int, default=20, help='habits per user')
+    parser.add_argument('--days', type=int, default=180, help='days of check-in history')
+    parser.add_argument('--completion-rate', type=float, default=0.7)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--auth-iterations', type=int, default=5, help='iterations for password-hashing endpoints')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', action='append', help='only run endpoints containing this text')
+    parser.add_argument('--cache', action='store_true', help='keep the analytics response cache enabled')
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON ('-' for stdout)")
+    parser.add_argument('--compare', metavar='PATH', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from models import db, Habit, User
+
+    workdir = tempfile.mkdtemp(prefix='habithero-bench-')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(workdir, 'bench.db'),
+        'CACHE_BACKEND': 'memory' if args.cache else 'null',
+        # Session cookie for the client, plus tokens so /api/auth/refresh can run
+        'AUTH_MODE': 'both'
+    })
+
+    with app.app_context():
+        started = time.perf_counter()
+        dataset = seed_dataset(args.users, args.habits, args.days, args.completion_rate)
+        dataset['seed_seconds'] = round(time.perf_counter() - started, 2)
+        user_id = User.query.filter_by(email=bench_email(0)).first().id
+        habit_ids = [habit_id for habit_id, in db.session.query(Habit.id).filter_by(user_id=user_id).order_by(Habit.id)]
+        queries = QueryCounter(db.engine)
+
+    client = app.test_client()
+    login(client)
+
+    results = []
+    for scenario in build_scenarios(app, habit_ids):
+        if args.only and not any(text in scenario[0] for text in args.only):
+            continue
+        iterations = args.auth_iterations if scenario[0] in HASHING_SCENARIOS else args.iterations
+        results.append(run_scenario(client, queries, scenario, iterations, args.warmup))
+        if not args.json or args.json != '-':
+            result = results[-1]
+            print(f"{result['endpoint']:<48} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                  f"p99 {result['p99_ms']:>9.2f}ms  queries {result['queries_avg']:>6}  "
+                  f"peak {result['peak_memory_kb']:>9.1f}KiB  {result['status_codes']}")
+
+    report = {
+        'dataset': dataset,
+        'parameters': vars(args),
+        'results': results
+    }
+    if args.compare:
+        print_comparison(results, args.compare)
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    elif args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Schedule engine benchmark: per-day checks versus bitmask due-sets.
+
+Builds synthetic habits in memory (no database) and times, for a date range,
+(a) the old approach of asking is_scheduled_on for every habit on every day and
+(b) services/scheduleService: scheduled_counts and due_masks.
+
+    python -m benchmarks.schedule_benchmark --habits 5000 --days 365
+"""
+import argparse
+import datetime
+import json
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from services.scheduleService import day_start, due_masks, is_scheduled_on, scheduled_counts
+
+def make_habits(count, today, seed=42):
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            id=index,
+            frequency=rng.choice(('daily', 'daily', 'weekly')),
+            start_date=day_start(today - datetime.timedelta(days=rng.randint(0, 730))),
+            target_duration=rng.choice((7, 21, 30, 66, 90, 365, 1000))
+        )
+        for index in range(count)
+    ]
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, round(best * 1000, 3)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--habits', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs')
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=args.days - 1)
+    habits = make_habits(args.habits, end)
+    dates = [start + datetime.timedelta(days=offset) for offset in range(args.days)]
+
+    naive_counts, naive_counts_ms = timed(
+        lambda: [sum(1 for habit in habits if is_scheduled_on(habit, day)) for day in dates], args.repeat)
+    counts, counts_ms = timed(lambda: scheduled_counts(habits, start, end), args.repeat)
+    if counts != naive_counts:
+        raise AssertionError('scheduled_counts disagrees with is_scheduled_on')
+
+    naive_sets, naive_sets_ms = timed(
+        lambda: {habit.id: [day for day in dates if is_scheduled_on(habit, day)] for habit in habits}, args.repeat)
+    masks, masks_ms = timed(lambda: due_masks(habits, start, end), args.repeat)
+    sample = habits[:50]
+    for habit in sample:
+        expected = sum(1 << (day - start).days for day in naive_sets[habit.id])
+        if masks[habit.id] != expected:
+            raise AssertionError(f'due mask mismatch for habit {habit.id}')
+
+    results = [
+        {'operation': 'scheduled count per day', 'per_day_checks_ms': naive_counts_ms, 'schedule_engine_ms': counts_ms},
+        {'operation': 'due-set per habit', 'per_day_checks_ms': naive_sets_ms, 'schedule_engine_ms': masks_ms},
+    ]
+    for result in results:
+        engine_ms = result['schedule_engine_ms']
+        result['speedup'] = round(result['per_day_checks_ms'] / engine_ms, 1) if engine_ms else None
+
+    if args.json != '-':
+        print(f'{args.habits} habits x {args.days} days')
+        for result in results:
+            print(f"{result['operation']:<26} per-day checks {result['per_day_checks_ms']:>10.2f}ms  "
+                  f"schedule engine {result['schedule_engine_ms']:>9.2f}ms  x{result['speedup']}")
+
+    report = {'parameters': vars(args), 'results': results}
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    elif args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+if __name__ == '__main__':
+    main()
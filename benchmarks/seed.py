@@ -0,0 +1,91 @@
+import datetime
+import random
+
+BENCH_PASSWORD = 'benchmark-password'
+
+def bench_email(user_index):
+    return f'bench{user_index}@example.com'
+
+def seed_dataset(users=10, habits_per_user=10, days=90, completion_rate=0.7, seed=42, batch_size=5000):
+    # Seeds users x habits x days of check-in history with bulk inserts, then
+    # rebuilds the derived streak counters, completion bitmaps and daily rollups.
+    # Must be called inside an app context.
+    from models import db, User, Habit, HabitCheckin
+    from services.streakService import rebuild_streaks
+    from services.rollupService import rebuild_rollups
+    from services.bitmapService import rebuild_bitmaps
+    from services.scheduleService import day_start
+    from werkzeug.security import generate_password_hash
+
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    today = datetime.datetime.now().date()
+    first_day = today - datetime.timedelta(days=days - 1)
+    categories = ['health', 'work', 'learning', 'Lifestyle', 'Fitness', 'Mental Wellness', 'Productivity']
+
+    # Hashing is deliberately slow, so every seeded user shares one hash
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    db.session.execute(db.insert(User), [
+        {
+            'name': f'Bench User {index}',
+            'email': bench_email(index),
+            'password_hash': password_hash,
+            'created_at': now,
+            'updated_at': now
+        }
+        for index in range(users)
+    ])
+    user_ids = [user_id for user_id, in db.session.query(User.id).filter(User.email.like('bench%@example.com')).order_by(User.id)]
+
+    habit_rows = []
+    for user_id in user_ids:
+        for index in range(habits_per_user):
+            start = first_day + datetime.timedelta(days=rng.randint(0, max(days // 4, 0)))
+            habit_rows.append({
+                'user_id': user_id,
+                'name': f'Habit {index}',
+                'frequency': 'weekly' if rng.random() < 0.2 else 'daily',
+                'category': rng.choice(categories),
+                'start_date': day_start(start),
+                'target_duration': days * 2,
+                'note': '',
+                'created_at': now,
+                'updated_at': now
+            })
+    db.session.execute(db.insert(Habit), habit_rows)
+
+    checkins = []
+    checkin_count = 0
+    for habit_id, start_date, frequency in db.session.query(Habit.id, Habit.start_date, Habit.frequency).filter(
+        Habit.user_id.in_(user_ids)
+    ):
+        day = start_date.date()
+        step = 7 if frequency == 'weekly' else 1
+        while day <= today:
+            if rng.random() < completion_rate:
+                checkins.append({
+                    'habit_id': habit_id,
+                    'checkin_date': day_start(day),
+                    'status': 'completed',
+                    'notes': '',
+                    'created_at': now
+                })
+            day += datetime.timedelta(days=step)
+        if len(checkins) >= batch_size:
+            db.session.execute(db.insert(HabitCheckin), checkins)
+            checkin_count += len(checkins)
+            checkins = []
+    if checkins:
+        db.session.execute(db.insert(HabitCheckin), checkins)
+        checkin_count += len(checkins)
+    db.session.commit()
+
+    rebuild_streaks()
+    rebuild_bitmaps()
+    rebuild_rollups(user_ids)
+
+    return {
+        'users': len(user_ids),
+        'habits': len(habit_rows),
+        'checkins': checkin_count
+    }
@@ -0,0 +1,119 @@
+"""Serialization benchmark: ORM to_dict versus column projections and orjson.
+
+Seeds one user with many habits and check-ins into a temporary SQLite database
+and times building the /api/habits and /api/habits/checkins payloads three ways:
+(a) loading ORM instances, calling to_dict and encoding with the stdlib encoder
+(the previous path), (b) selecting projected column tuples and encoding with the
+stdlib encoder, (c) projected tuples encoded with orjson.
+
+    python -m benchmarks.serialization_benchmark --habits 2000 --days 30
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_dataset
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--habits', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=30, help='days of check-in history per habit')
+    parser.add_argument('--repeat', type=int, default=5, help='best of N runs')
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    from flask.json.provider import DefaultJSONProvider
+    from app import create_app
+    from models import db, Habit, HabitCheckin
+    from services.jsonService import OrjsonProvider, orjson
+    from services.serializerService import projection_for
+
+    workdir = tempfile.mkdtemp(prefix='habithero-serialize-')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(workdir, 'bench.db'),
+        'CACHE_BACKEND': 'null'
+    })
+
+    results = []
+    with app.app_context():
+        dataset = seed_dataset(users=1, habits_per_user=args.habits, days=args.days)
+        user_id = db.session.query(Habit.user_id).limit(1).scalar()
+        stdlib = DefaultJSONProvider(app)
+        encoders = [('stdlib', lambda payload: stdlib.dumps(payload, separators=(',', ':')).encode('utf-8'))]
+        if orjson is not None:
+            fast = OrjsonProvider(app)
+            encoders.append(('orjson', fast.encode))
+
+        payloads = {
+            'habits': (Habit, lambda: Habit.query.filter_by(user_id=user_id).order_by(Habit.id)),
+            'checkins': (HabitCheckin, lambda: HabitCheckin.query.join(Habit, HabitCheckin.habit_id == Habit.id).filter(
+                Habit.user_id == user_id
+            ).order_by(HabitCheckin.checkin_date.desc(), HabitCheckin.id.desc()))
+        }
+        for name, (model, build_query) in payloads.items():
+            projection = projection_for(model)
+
+            def orm_payload():
+                # A fresh session each run so instances are hydrated, not served from the identity map
+                db.session.remove()
+                return {'success': True, name: [item.to_dict() for item in build_query().all()]}
+
+            def projected_payload():
+                db.session.remove()
+                return {'success': True, name: projection.serialize_all(projection.select(build_query()).all())}
+
+            variants = [('orm to_dict', orm_payload, encoders[0])]
+            variants += [('projection', projected_payload, encoder) for encoder in encoders]
+            expected = None
+            for label, build, (encoder_name, encode) in variants:
+                body, seconds = timed(lambda: encode(build()), args.repeat)
+                decoded = json.loads(body)
+                if expected is None:
+                    expected = decoded
+                elif decoded != expected:
+                    raise AssertionError(f'{name}: {label} + {encoder_name} payload differs from to_dict')
+                rows = len(decoded[name])
+                results.append({
+                    'payload': name,
+                    'path': f'{label} + {encoder_name}',
+                    'rows': rows,
+                    'ms': round(seconds * 1000, 2),
+                    'rows_per_second': round(rows / seconds) if seconds else None,
+                    'mb_per_second': round(len(body) / seconds / 1e6, 1) if seconds else None
+                })
+
+    for name in payloads:
+        baseline = next(result for result in results if result['payload'] == name)
+        for result in results:
+            if result['payload'] == name:
+                result['speedup'] = round(baseline['ms'] / result['ms'], 2) if result['ms'] else None
+
+    if args.json != '-':
+        print(f"{dataset['habits']} habits, {dataset['checkins']} check-ins")
+        for result in results:
+            print(f"{result['payload']:<9} {result['path']:<21} {result['ms']:>9.2f}ms  "
+                  f"{result['rows_per_second']:>9} rows/s  {result['mb_per_second']:>6} MB/s  x{result['speedup']}")
+
+    report = {'dataset': dataset, 'parameters': vars(args), 'results': results}
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    elif args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+if __name__ == '__main__':
+    main()
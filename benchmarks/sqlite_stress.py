@@ -0,0 +1,161 @@
+"""SQLite stress test: concurrent writers and readers, default vs tuned engine profile.
+
+For each profile a fresh database is seeded, then writer processes create habits
+and mark them done while reader processes poll the analytics and today views,
+each through its own app instance and test client, for a fixed duration.
+Separate processes contend for SQLite's file locks the way gunicorn workers do.
+Reports completed operations per second, latency percentiles and failed
+requests per role.
+
+    python -m benchmarks.sqlite_stress --writers 4 --readers 4 --seconds 10
+    python -m benchmarks.sqlite_stress --profile tuned --json stress.json
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.run_benchmarks import percentile
+from benchmarks.seed import BENCH_PASSWORD, bench_email, seed_dataset
+
+PROFILES = {
+    # SQLite's own defaults: rollback journal, synchronous=FULL, 2 MiB page cache, no mmap
+    'default': {'SQLITE_TUNING_ENABLED': False},
+    'tuned': {'SQLITE_TUNING_ENABLED': True}
+}
+
+READ_PATHS = ['/api/habits/analytics', '/api/habits/today', '/api/habits/daily-success', '/api/habits/calendar']
+
+def make_app(profile, database_uri):
+    from app import create_app
+    return create_app(dict(PROFILES[profile], **{
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'CACHE_BACKEND': 'null',
+        'METRICS_ENABLED': False
+    }))
+
+def write_loop(client, deadline, record):
+    today = datetime.date.today().isoformat()
+    index = 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        response = client.post('/api/habits', json={
+            'name': f'Stress {index}', 'frequency': 'daily', 'category': 'health',
+            'start_date': today, 'target_duration': 30
+        })
+        record(started, response.status_code)
+        if response.status_code != 201:
+            continue
+        started = time.perf_counter()
+        response = client.post('/api/habits/mark-done', json={'habit_id': response.get_json()['habit']['id']})
+        record(started, response.status_code)
+        index += 1
+
+def read_loop(client, deadline, record):
+    index = 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        response = client.get(READ_PATHS[index % len(READ_PATHS)])
+        record(started, response.status_code)
+        index += 1
+
+def worker(profile, database_uri, role, user_index, seconds, barrier, results):
+    app = make_app(profile, database_uri)
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'email': bench_email(user_index), 'password': BENCH_PASSWORD})
+    if response.status_code != 200:
+        raise RuntimeError(f'Stress test login failed: {response.get_json()}')
+
+    samples = []
+    failures = {}
+
+    def record(started, status):
+        if status in (200, 201):
+            samples.append((time.perf_counter() - started) * 1000)
+        else:
+            failures[status] = failures.get(status, 0) + 1
+
+    # Start every worker together once all of them have logged in
+    barrier.wait()
+    (write_loop if role == 'write' else read_loop)(client, time.time() + seconds, record)
+    results.put((role, samples, failures))
+
+def run_profile(profile, args):
+    workdir = tempfile.mkdtemp(prefix=f'habithero-stress-{profile}-')
+    database_uri = 'sqlite:///' + os.path.join(workdir, 'stress.db')
+    app = make_app(profile, database_uri)
+    from models import db
+    with app.app_context():
+        seed_dataset(args.writers + args.readers, args.habits, args.days)
+        db.engine.dispose()
+
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(args.writers + args.readers)
+    results = context.Queue()
+    # Writers and readers act as different users, as in production
+    roles = ['write'] * args.writers + ['read'] * args.readers
+    processes = [
+        context.Process(target=worker, args=(profile, database_uri, role, index, args.seconds, barrier, results))
+        for index, role in enumerate(roles)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    result = {'profile': profile, 'seconds': args.seconds}
+    for role in ('write', 'read'):
+        samples = [sample for kind, values, _ in collected if kind == role for sample in values]
+        failures = {}
+        for kind, _, counts in collected:
+            if kind == role:
+                for status, count in counts.items():
+                    failures[status] = failures.get(status, 0) + count
+        result[role] = {
+            'ok': len(samples),
+            'ops_per_second': round(len(samples) / args.seconds, 1),
+            'p50_ms': round(percentile(samples, 50), 2),
+            'p95_ms': round(percentile(samples, 95), 2),
+            'p99_ms': round(percentile(samples, 99), 2),
+            'failures': {str(code): count for code, count in sorted(failures.items())}
+        }
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--habits', type=int, default=20, help='seeded habits per user')
+    parser.add_argument('--days', type=int, default=90, help='days of seeded check-in history')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--profile', choices=('both',) + tuple(PROFILES), default='both')
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    names = list(PROFILES) if args.profile == 'both' else [args.profile]
+    results = [run_profile(name, args) for name in names]
+
+    if args.json != '-':
+        for result in results:
+            for role in ('write', 'read'):
+                stats = result[role]
+                print(f"{result['profile']:<8} {role:<6} {stats['ops_per_second']:>8.1f} ops/s  "
+                      f"p50 {stats['p50_ms']:>8.2f}ms  p95 {stats['p95_ms']:>8.2f}ms  "
+                      f"p99 {stats['p99_ms']:>8.2f}ms  failures {stats['failures']}")
+
+    report = {'parameters': vars(args), 'results': results}
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    elif args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    return report
+
+if __name__ == '__main__':
+    main()
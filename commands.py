@@ -0,0 +1,99 @@
+import click
+
+def register_commands(app):
+    @app.cli.command('rebuild-streaks')
+    @click.option('--habit-id', 'habit_ids', type=int, multiple=True, help='Only rebuild these habits')
+    def rebuild_streaks_command(habit_ids):
+        """Recompute stored streak counters from check-in history."""
+        from services.streakService import rebuild_streaks
+        count = rebuild_streaks(list(habit_ids) if habit_ids else None)
+        click.echo(f'Rebuilt streaks for {count} habit(s)')
+    
+    @app.cli.command('backfill-rollups')
+    @click.option('--user-id', 'user_ids', type=int, multiple=True, help='Only rebuild these users')
+    def backfill_rollups_command(user_ids):
+        """Rebuild the daily_user_stats rollup from habits and check-ins."""
+        from services.rollupService import rebuild_rollups
+        rows = rebuild_rollups(list(user_ids) if user_ids else None)
+        click.echo(f'Materialized {rows} daily rollup row(s)')
+    
+    @app.cli.command('check-bitmaps')
+    @click.option('--habit-id', 'habit_ids', type=int, multiple=True, help='Only check these habits')
+    @click.option('--fix', is_flag=True, help='Rewrite mismatched bitmaps from the check-in rows')
+    def check_bitmaps_command(habit_ids, fix):
+        """Compare completion bitmaps with the habit_checkins table."""
+        from services.bitmapService import check_bitmaps
+        mismatches = check_bitmaps(list(habit_ids) if habit_ids else None, fix=fix)
+        for habit_id, (missing, unexpected) in sorted(mismatches.items()):
+            click.echo(f'habit {habit_id}: {len(missing)} completion(s) missing from the bitmap, '
+                       f'{len(unexpected)} without a check-in row')
+        if not mismatches:
+            click.echo('All completion bitmaps match their check-ins')
+        elif fix:
+            click.echo(f'Rebuilt {len(mismatches)} bitmap(s)')
+        else:
+            raise click.ClickException(f'{len(mismatches)} habit(s) out of sync, rerun with --fix to repair')
+    
+    @app.cli.command('run-nightly')
+    @click.option('--from', 'since', type=click.DateTime(formats=['%Y-%m-%d']), help='First day to process (default: the day after the last run)')
+    @click.option('--through', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day to process (default: yesterday)')
+    def run_nightly_command(since, through):
+        """Record missed days as skipped check-ins and reset broken streaks."""
+        from services.nightlyService import last_ended_day, run_nightly
+        last_day = last_ended_day()
+        if through and through.date() > last_day:
+            raise click.ClickException(f'--through must be a day that has ended for every user ({last_day} or earlier)')
+        if since and since.date() > (through.date() if through else last_day):
+            raise click.ClickException('--from must not be after --through')
+        summary = run_nightly(through.date() if through else None, since.date() if since else None)
+        if summary is None:
+            click.echo('Nothing to do: already up to date or running in another worker')
+        else:
+            click.echo(f"Processed {summary['from']} to {summary['through']}: {summary['skipped_rows']} skipped check-in(s), "
+                       f"{summary['streaks_reset']} streak(s) reset, {summary['users']} user(s) refreshed")
+    
+    @app.cli.command('import-habits')
+    @click.option('--user-id', type=int, required=True, help='Owner of the imported habits')
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Default: from the file extension')
+    @click.argument('source', type=click.File('rb'))
+    def import_habits_command(user_id, fmt, source):
+        """Import habits and check-ins from a CSV or NDJSON file (- for stdin)."""
+        from models import db, User
+        from services.timezoneService import default_timezone, local_today
+        from services.transferService import HabitImport, read_records
+        user = db.session.get(User, user_id)
+        if user is None:
+            raise click.ClickException(f'User {user_id} not found')
+        fmt = fmt or ('csv' if source.name.endswith('.csv') else 'ndjson')
+        importer = HabitImport(user_id, local_today(user.timezone or default_timezone()), app.config.get('IMPORT_BATCH_SIZE', 1000))
+        try:
+            importer.run(read_records(source, fmt))
+        except Exception as e:
+            click.echo(f'Import error: {e}', err=True)
+        summary = importer.summary()
+        for error in summary['errors']:
+            click.echo(f"line {error['line']}: {error['error']}", err=True)
+        click.echo(f"Imported {summary['habits']} habit(s) and {summary['checkins']} check-in(s); "
+                   f"{summary['duplicates']} duplicate(s), {summary['failed']} record(s) rejected")
+        if not summary['complete']:
+            raise click.ClickException(summary['error'])
+    
+    @app.cli.command('export-habits')
+    @click.option('--user-id', type=int, required=True, help='Owner of the exported habits')
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default='ndjson', show_default=True)
+    @click.option('--output', type=click.File('w', encoding='utf-8'), default='-', help='Default: stdout')
+    def export_habits_command(user_id, fmt, output):
+        """Export a user's habits and check-ins as CSV or NDJSON."""
+        from services.transferService import export_records, format_records
+        for chunk in format_records(export_records(user_id, app.config.get('IMPORT_BATCH_SIZE', 1000)), fmt, app.json.dumps):
+            output.write(chunk)
+    
+    @app.cli.command('sync-replica')
+    def sync_replica_command():
+        """Copy the primary SQLite database into READ_REPLICA_URL."""
+        from services.replicaService import sync_replica
+        try:
+            sync_replica()
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo('Read replica synced')
@@ -3,4 +3,78 @@ import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'habithero-secret-key-2024'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///habithero.db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Per-user response cache for analytics endpoints: 'memory' (per process),
+    # 'sqlite' (shared by all workers on a host) or 'null' to disable
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'memory'
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL') or 60)
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES') or 2048)
+    CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH') or 'habithero-cache.db'
+    
+    # Request instrumentation exposed at /api/metrics (Prometheus text format)
+    METRICS_ENABLED = (os.environ.get('METRICS_ENABLED') or 'true').lower() == 'true'
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS') or 100)
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD') or 10)
+    
+    # JSON encoder behind jsonify: 'orjson', 'stdlib' or 'auto' (orjson when installed)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER') or 'auto'
+    
+    # Timezone for users who haven't set one; empty means the server's local time
+    DEFAULT_TIMEZONE = os.environ.get('DEFAULT_TIMEZONE') or ''
+    
+    # 'session' (cookie sessions), 'token' (signed bearer tokens only) or 'both'
+    AUTH_MODE = os.environ.get('AUTH_MODE') or 'session'
+    ACCESS_TOKEN_TTL = int(os.environ.get('ACCESS_TOKEN_TTL') or 900)
+    REFRESH_TOKEN_TTL = int(os.environ.get('REFRESH_TOKEN_TTL') or 30 * 24 * 3600)
+    REVOCATION_SYNC_SECONDS = int(os.environ.get('REVOCATION_SYNC_SECONDS') or 30)
+    
+    # Password hashing: any werkzeug method string, e.g. 'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'.
+    # Stored hashes are upgraded on the next successful login when this changes.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:600000'
+    # Worker threads (0 hashes inline), extra queued requests and how long to wait for a slot
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE') or 8)
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT') or 0.1)
+    
+    # SQLite engine profile applied in create_app (see services/sqliteService.py).
+    # Set a pragma to an empty string to leave SQLite's default in place.
+    SQLITE_TUNING_ENABLED = (os.environ.get('SQLITE_TUNING_ENABLED') or 'true').lower() == 'true'
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'wal')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'normal')
+    # Negative values are KiB, so -65536 is a 64 MiB page cache per connection
+    SQLITE_CACHE_SIZE = os.environ.get('SQLITE_CACHE_SIZE', '-65536')
+    SQLITE_MMAP_SIZE = os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT_MS = os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')
+    # How many times retry_on_busy re-runs a write view whose transaction hit
+    # SQLITE_BUSY after busy_timeout ran out (with 50 ms, 100 ms, ... backoff)
+    SQLITE_WRITE_RETRIES = int(os.environ.get('SQLITE_WRITE_RETRIES') or 3)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT') or 30)
+    
+    # Nightly batch (services/nightlyService.py): records missed days as skipped
+    # check-ins and resets broken streaks. Off by default; `flask run-nightly` runs it by hand.
+    NIGHTLY_JOBS_ENABLED = (os.environ.get('NIGHTLY_JOBS_ENABLED') or 'false').lower() == 'true'
+    NIGHTLY_RUN_AFTER = os.environ.get('NIGHTLY_RUN_AFTER') or '00:05'
+    NIGHTLY_CHECK_SECONDS = int(os.environ.get('NIGHTLY_CHECK_SECONDS') or 300)
+    NIGHTLY_LOCK_SECONDS = int(os.environ.get('NIGHTLY_LOCK_SECONDS') or 1800)
+    NIGHTLY_BATCH_SIZE = int(os.environ.get('NIGHTLY_BATCH_SIZE') or 500)
+    
+    # Records per batch (and per transaction) for habit imports, rows per fetch for exports
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE') or 1000)
+    
+    # Optional read replica (its own engine and pool) for the analytics views, e.g.
+    # sqlite:////var/lib/habithero/replica.db kept fresh with `flask sync-replica`
+    READ_REPLICA_URL = os.environ.get('READ_REPLICA_URL')
+    # Seconds of replica lag each endpoint tolerates before reading the primary,
+    # as "endpoint=seconds,..."; other endpoints use REPLICA_DEFAULT_STALENESS
+    REPLICA_DEFAULT_STALENESS = float(os.environ.get('REPLICA_DEFAULT_STALENESS') or 30)
+    REPLICA_STALENESS = {
+        endpoint.strip(): float(seconds)
+        for endpoint, seconds in (
+            item.split('=', 1)
+            for item in (os.environ.get('REPLICA_STALENESS') or 'analytics=60,calendar=300,daily-success=60').split(',')
+            if item.strip()
+        )
+    }
@@ -1,10 +1,33 @@
 from flask import jsonify, request, session
+from services.passwordService import HashingBusy
+from services.sqliteService import retry_on_busy
+from services.tokenService import (
+    ACCESS, REFRESH, TokenError, current_token_claims, current_user_id, issue_token, issue_token_pair,
+    revoke, sessions_enabled, tokens_enabled, verify_token
+)
+from services.timezoneService import valid_timezone
 import re
 
 def validate_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
 
+def hashing_busy_response():
+    response = jsonify({'success': False, 'error': 'Server is busy, please try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def start_auth(user, payload):
+    # Session cookie and/or signed tokens depending on AUTH_MODE
+    if sessions_enabled():
+        session['user_id'] = user.id
+        session['authenticated'] = True
+        session['timezone'] = user.timezone
+    if tokens_enabled():
+        payload.update(issue_token_pair(user))
+    return payload
+
+@retry_on_busy
 def register_user():
     try:
         data = request.get_json()
@@ -26,34 +49,40 @@ def register_user():
         if len(password) < 6:
             return jsonify({'success': False, 'error': 'Password must be at least 6 characters long'}), 400
         
+        # Optional IANA timezone; the server default applies until one is set
+        timezone = data.get('timezone') or None
+        if timezone is not None and not valid_timezone(timezone):
+            return jsonify({'success': False, 'error': 'Invalid timezone'}), 400
+        
         # Import inside function to avoid circular imports
         from models import db, User
         
         if User.query.filter_by(email=email).first():
             return jsonify({'success': False, 'error': 'User with this email already exists'}), 409
         
-        new_user = User(name=name, email=email)
+        new_user = User(name=name, email=email, timezone=timezone)
         new_user.set_password(password)
         
         db.session.add(new_user)
         db.session.commit()
         
-        # Store user ID in session
-        session['user_id'] = new_user.id
-        session['authenticated'] = True
-        
-        return jsonify({
+        return jsonify(start_auth(new_user, {
             'success': True,
             'message': 'User registered successfully',
             'user': new_user.to_dict()
-        }), 201
+        })), 201
         
+    except HashingBusy:
+        from models import db
+        db.session.rollback()
+        return hashing_busy_response()
     except Exception as e:
         from models import db
         db.session.rollback()
         print(f"Registration error: {str(e)}")
         return jsonify({'success': False, 'error': 'Registration failed. Please try again.'}), 500
 
+@retry_on_busy
 def login_user():
     try:
         data = request.get_json()
@@ -65,33 +94,92 @@ def login_user():
         password = data['password']
         
         # Import inside function to avoid circular imports
-        from models import User
+        from models import db, User
         
         user = User.query.filter_by(email=email).first()
         
         if not user or not user.check_password(password):
             return jsonify({'success': False, 'error': 'Invalid email or password'}), 401
         
-        # Store user ID in session
-        session['user_id'] = user.id
-        session['authenticated'] = True
-        
-        return jsonify({
+        # Re-hash with the configured algorithm/cost while we have the plaintext.
+        # The first check in a process hashes once to learn the configured prefix,
+        # so it is skipped along with the re-hash when the pool is saturated.
+        try:
+            if user.password_needs_upgrade():
+                user.set_password(password)
+                db.session.commit()
+        except HashingBusy:
+            db.session.rollback()
+        
+        return jsonify(start_auth(user, {
             'success': True,
             'message': 'Login successful',
             'user': user.to_dict()
-        }), 200
+        })), 200
         
+    except HashingBusy:
+        return hashing_busy_response()
     except Exception as e:
+        from models import db
+        db.session.rollback()
         print(f"Login error: {str(e)}")
         return jsonify({'success': False, 'error': 'Login failed. Please try again.'}), 500
 
+@retry_on_busy
 def logout_user():
+    # Revoke whatever tokens the client presents, then drop the session
+    claims = current_token_claims()
+    if claims:
+        revoke(claims)
+    
+    data = request.get_json(silent=True) or {}
+    if tokens_enabled() and data.get('refresh_token'):
+        try:
+            revoke(verify_token(data['refresh_token'], REFRESH))
+        except TokenError:
+            pass
+    
     session.clear()
     return jsonify({'success': True, 'message': 'Logged out successfully'}), 200
 
+@retry_on_busy
+def refresh_tokens():
+    if not tokens_enabled():
+        return jsonify({'success': False, 'error': 'Token authentication is disabled'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    if not data.get('refresh_token'):
+        return jsonify({'success': False, 'error': 'Refresh token is required'}), 400
+    
+    try:
+        claims = verify_token(data['refresh_token'], REFRESH)
+    except TokenError as e:
+        return jsonify({'success': False, 'error': str(e)}), 401
+    
+    # Import inside function to avoid circular imports
+    from models import User
+    
+    user = User.query.get(claims['sub'])
+    if not user:
+        return jsonify({'success': False, 'error': 'User not found'}), 404
+    
+    # Refresh tokens are single use
+    revoke(claims)
+    
+    payload = {'success': True}
+    payload.update(issue_token_pair(user))
+    return jsonify(payload), 200
+
 def get_current_user():
-    user_id = session.get('user_id')
+    # Access tokens carry the user's public fields, so no lookup is needed
+    claims = current_token_claims()
+    if claims and claims.get('user'):
+        return jsonify({
+            'success': True,
+            'user': claims['user']
+        }), 200
+    
+    user_id = current_user_id()
     if not user_id:
         return jsonify({'success': False, 'error': 'Not authenticated'}), 401
     
@@ -106,4 +194,45 @@ def get_current_user():
     return jsonify({
         'success': True,
         'user': user.to_dict()
-    }), 200
\ No newline at end of file
+    }), 200
+
+@retry_on_busy
+def update_current_user():
+    user_id = current_user_id()
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Not authenticated'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    if 'timezone' not in data:
+        return jsonify({'success': False, 'error': 'Nothing to update'}), 400
+    timezone = data['timezone'] or None
+    if timezone is not None and not valid_timezone(timezone):
+        return jsonify({'success': False, 'error': 'Invalid timezone'}), 400
+    
+    try:
+        # Import inside function to avoid circular imports
+        from models import db, User
+        from services.cacheService import invalidate_user
+        
+        user = db.session.get(User, user_id)
+        if not user:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
+        
+        user.timezone = timezone
+        # "Today" moved, so cached views and ETags are stale
+        invalidate_user(user_id)
+        db.session.commit()
+        if sessions_enabled() and session.get('user_id') == user_id:
+            session['timezone'] = timezone
+        
+        payload = {'success': True, 'user': user.to_dict()}
+        # Access tokens carry the timezone; hand out one with the new value
+        if current_token_claims():
+            payload['access_token'] = issue_token(ACCESS, user)
+        return jsonify(payload), 200
+        
+    except Exception as e:
+        from models import db
+        db.session.rollback()
+        print(f"Update user error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to update user'}), 500
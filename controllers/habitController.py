@@ -1,62 +1,200 @@
-from flask import jsonify, request, session
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import tuple_ as db_tuple
+from services.cacheService import cached_per_user, conditional_get, invalidate_user
+from services.rollupService import ensure_rollup, read_rollup, apply_habit_schedule, record_checkin, record_checkins, remove_habit
+from services.scheduleService import day_start, due_on
+from services.bitmapService import set_completed, streak_counters, success_rate
+from services.tokenService import current_user_id
+from services.timezoneService import user_now, user_today
+from services.paginationService import wants_pagination, wants_stream, page_args, fetch_page, ndjson_response
+from services.sqliteService import retry_on_busy
+from services.serializerService import projection_for
+from services.replicaService import read_replica
+from services.transferService import FORMATS as TRANSFER_FORMATS, HabitImport, read_records, export_records, format_records
+from models.habitModel import HABIT_CATEGORIES, HABIT_FREQUENCIES, CHECKIN_STATUSES
 import datetime
 import random
 
+# Windows (in days) accepted by get_daily_success_data
+SUCCESS_WINDOWS = (7, 30, 90, 365)
+
+# Longest range served by the calendar heatmap, and its default
+MAX_HEATMAP_DAYS = 5 * 366
+DEFAULT_HEATMAP_DAYS = 365
+
+# Largest batch accepted by bulk_checkin
+MAX_BULK_CHECKINS = 1000
+
 # Helper functions
 def get_current_user_id():
-    return session.get('user_id')
+    return current_user_id()
 
-def calculate_streak(habit_id):
-    try:
-        from models import HabitCheckin
-        checkins = HabitCheckin.query.filter_by(
-            habit_id=habit_id, 
-            status='completed'
-        ).order_by(HabitCheckin.checkin_date.desc()).all()
-        
-        if not checkins:
-            return 0
-        
-        streak = 0
-        current_date = datetime.datetime.now().date()
-        
-        for checkin in checkins:
-            checkin_date = checkin.checkin_date.date()
-            
-            if (current_date - checkin_date).days == streak:
-                streak += 1
-            else:
-                break
-        
-        return streak
-    except Exception as e:
-        print(f"Calculate streak error: {str(e)}")
-        return 0
+def calculate_streak(habit, today=None):
+    # Streak counters are maintained on the habit by mark_habit_done (see Habit.record_completion)
+    return habit.streak_as_of(today or user_today())
 
-def calculate_best_day(habit_ids):
-    try:
-        from models import HabitCheckin
-        day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        
-        checkins = HabitCheckin.query.filter(
+def build_today_view(user_id, today=None):
+    # Returns (habit, today_checkin, streak) for every habit scheduled today using a
+    # fixed number of queries: habits and today's check-ins. Ordered by id
+    # explicitly; without it SQLite returns whatever order the index it picks has.
+    from models import Habit, HabitCheckin
+    today = today or user_today()
+    habits = Habit.query.filter_by(user_id=user_id).order_by(Habit.id).all()
+    today_habits = due_on(habits, today)
+    if not today_habits:
+        return []
+    
+    habit_ids = [habit.id for habit in today_habits]
+    today_checkins = {
+        checkin.habit_id: checkin
+        for checkin in HabitCheckin.query.filter(
             HabitCheckin.habit_id.in_(habit_ids),
-            HabitCheckin.status == 'completed'
+            HabitCheckin.checkin_date == day_start(today)
         ).all()
-        
-        if not checkins:
-            return 'No data yet'
-        
-        day_counts = {i: 0 for i in range(7)}
-        for checkin in checkins:
-            day_of_week = checkin.checkin_date.weekday()
-            day_counts[day_of_week] += 1
-        
-        best_day_index = max(day_counts, key=day_counts.get)
-        return day_names[best_day_index]
-        
-    except Exception as e:
-        print(f"Best day calculation error: {str(e)}")
-        return 'Unknown'
+    }
+    
+    return [(habit, today_checkins.get(habit.id), calculate_streak(habit, today)) for habit in today_habits]
+
+def list_habits(query):
+    # Full list by default, keyset pages with ?limit=&cursor=, or an NDJSON
+    # stream with ?format=ndjson. Rows are selected as column tuples and
+    # serialized without building Habit instances.
+    from models import Habit
+    projection = projection_for(Habit)
+    query = projection.select(query.order_by(Habit.id))
+    
+    if wants_stream():
+        return ndjson_response(query, projection.serialize)
+    
+    if wants_pagination():
+        limit, cursor = page_args()
+        if cursor:
+            query = query.filter(Habit.id > parse_cursor(cursor, int))
+        habits, next_cursor = fetch_page(query, limit, lambda habit: [habit.id])
+        return jsonify({
+            'success': True,
+            'habits': projection.serialize_all(habits),
+            'next_cursor': next_cursor
+        }), 200
+    
+    return jsonify({
+        'success': True,
+        'habits': projection.serialize_all(query.all())
+    }), 200
+
+def parse_cursor(cursor, *types):
+    # Converts decoded cursor values to the keyset column types
+    if len(cursor) != len(types):
+        raise ValueError('Invalid cursor')
+    try:
+        values = [cast(value) for cast, value in zip(types, cursor)]
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    return values[0] if len(values) == 1 else values
+
+def parse_date_range():
+    # Optional ?from=YYYY-MM-DD&to=YYYY-MM-DD; raises ValueError with the reason
+    bounds = []
+    for name in ('from', 'to'):
+        value = request.args.get(name)
+        try:
+            bounds.append(datetime.date.fromisoformat(value) if value else None)
+        except ValueError:
+            raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+    if bounds[0] and bounds[1] and bounds[0] > bounds[1]:
+        raise ValueError('from must not be after to')
+    return bounds[0], bounds[1]
+
+def parse_category():
+    category = request.args.get('category')
+    if category and category not in HABIT_CATEGORIES:
+        raise ValueError('Invalid category')
+    return category
+
+def checkin_totals_by_weekday(user_id, start=None, end=None, category=None):
+    # {weekday (Monday = 0): (completed, skipped)} in one GROUP BY. Reads the daily
+    # rollup when possible; a category filter needs the check-in rows themselves.
+    from models import db, Habit, HabitCheckin, DailyUserStats
+    if category is None:
+        weekday = db.func.strftime('%w', DailyUserStats.date)
+        query = db.session.query(
+            weekday, db.func.sum(DailyUserStats.completed), db.func.sum(DailyUserStats.skipped)
+        ).filter(DailyUserStats.user_id == user_id)
+        if start:
+            query = query.filter(DailyUserStats.date >= start)
+        if end:
+            query = query.filter(DailyUserStats.date <= end)
+    else:
+        weekday = db.func.strftime('%w', HabitCheckin.checkin_date)
+        query = db.session.query(
+            weekday,
+            db.func.sum(db.case((HabitCheckin.status == 'completed', 1), else_=0)),
+            db.func.sum(db.case((HabitCheckin.status == 'skipped', 1), else_=0))
+        ).join(Habit, HabitCheckin.habit_id == Habit.id).filter(
+            Habit.user_id == user_id,
+            Habit.category == category
+        )
+        if start:
+            query = query.filter(HabitCheckin.checkin_date >= day_start(start))
+        if end:
+            query = query.filter(HabitCheckin.checkin_date < day_start(end + datetime.timedelta(days=1)))
+    
+    # SQLite's %w counts from Sunday = 0
+    return {
+        (int(sqlite_weekday) + 6) % 7: (completed or 0, skipped or 0)
+        for sqlite_weekday, completed, skipped in query.group_by(weekday).all()
+    }
+
+def build_heatmap(user_id, start, end, by_habit=False):
+    # Completed check-ins per day between start and end as parallel arrays, with
+    # only the days that have completions. Totals come from the daily rollup; the
+    # per-habit breakdown is a GROUP BY over habit_checkins (a habit has at most
+    # one check-in per day, so each habit's breakdown is just its dates).
+    from models import db, Habit, HabitCheckin, DailyUserStats
+    if ensure_rollup(user_id, min(end, user_today())):
+        db.session.commit()
+    
+    rows = db.session.query(DailyUserStats.date, DailyUserStats.completed).filter(
+        DailyUserStats.user_id == user_id,
+        DailyUserStats.date >= start,
+        DailyUserStats.date <= end,
+        DailyUserStats.completed > 0
+    ).order_by(DailyUserStats.date).all()
+    heatmap = {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'dates': [day.isoformat() for day, _ in rows],
+        'counts': [completed for _, completed in rows],
+        'total': sum(completed for _, completed in rows)
+    }
+    
+    if by_habit:
+        checkin_day = db.func.date(HabitCheckin.checkin_date)
+        habit_rows = db.session.query(Habit.id, Habit.name, checkin_day).join(
+            HabitCheckin, HabitCheckin.habit_id == Habit.id
+        ).filter(
+            Habit.user_id == user_id,
+            HabitCheckin.status == 'completed',
+            HabitCheckin.checkin_date >= day_start(start),
+            HabitCheckin.checkin_date < day_start(end + datetime.timedelta(days=1))
+        ).group_by(Habit.id, checkin_day).order_by(Habit.id, checkin_day).all()
+        
+        habits = []
+        for habit_id, name, day in habit_rows:
+            if not habits or habits[-1]['id'] != habit_id:
+                habits.append({'id': habit_id, 'name': name, 'dates': []})
+            habits[-1]['dates'].append(day)
+        heatmap['habits'] = habits
+    
+    return heatmap
+
+def calculate_best_day(weekday_totals):
+    day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    day_counts = [weekday_totals.get(index, (0, 0))[0] for index in range(7)]
+    if not any(day_counts):
+        return 'No data yet'
+    return day_names[max(range(7), key=lambda index: day_counts[index])]
 
 def generate_motivational_quote(success_rate, total_habits):
     quotes_by_category = {
@@ -122,6 +260,7 @@ def generate_motivational_quote(success_rate, total_habits):
     return random.choice(quotes_by_category[category])
 
 # Habit Routes
+@retry_on_busy
 def create_habit():
     user_id = get_current_user_id()
     if not user_id:
@@ -138,11 +277,10 @@ def create_habit():
         if missing_fields:
             return jsonify({'success': False, 'error': f'Missing fields: {", ".join(missing_fields)}'}), 400
         
-        if data['frequency'] not in ['daily', 'weekly']:
+        if data['frequency'] not in HABIT_FREQUENCIES:
             return jsonify({'success': False, 'error': 'Frequency must be daily or weekly'}), 400
         
-        valid_categories = ['health', 'work', 'learning', 'Lifestyle', 'Fitness', 'Mental Wellness', 'Productivity']
-        if data['category'] not in valid_categories:
+        if data['category'] not in HABIT_CATEGORIES:
             return jsonify({'success': False, 'error': 'Invalid category'}), 400
         
         try:
@@ -150,17 +288,31 @@ def create_habit():
         except:
             return jsonify({'success': False, 'error': 'Invalid start date format'}), 400
         
+        # Scheduling does arithmetic on it, so numeric strings like "30" are cast here
+        target_duration = data['target_duration']
+        try:
+            if isinstance(target_duration, bool) or not isinstance(target_duration, (int, str)):
+                raise ValueError
+            target_duration = int(target_duration)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'target_duration must be an integer'}), 400
+        if target_duration < 1:
+            return jsonify({'success': False, 'error': 'target_duration must be positive'}), 400
+        
         new_habit = Habit(
             user_id=user_id,
             name=data['name'].strip(),
             frequency=data['frequency'],
             category=data['category'],
             start_date=start_date,
-            target_duration=data['target_duration'],
+            target_duration=target_duration,
             note=data.get('note', '').strip()
         )
         
         db.session.add(new_habit)
+        apply_habit_schedule(new_habit, 1)
+        ensure_rollup(user_id, user_today())
+        invalidate_user(user_id)
         db.session.commit()
         
         return jsonify({
@@ -175,6 +327,7 @@ def create_habit():
         print(f"Create habit error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to create habit'}), 500
 
+@conditional_get('habits')
 def get_user_habits():
     user_id = get_current_user_id()
     if not user_id:
@@ -182,47 +335,26 @@ def get_user_habits():
     
     try:
         from models import Habit
-        habits = Habit.query.filter_by(user_id=user_id).all()
-        return jsonify({
-            'success': True,
-            'habits': [habit.to_dict() for habit in habits]
-        }), 200
+        return list_habits(Habit.query.filter_by(user_id=user_id))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Get habits error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to fetch habits'}), 500
 
+@conditional_get('today')
 def get_today_habits():
     user_id = get_current_user_id()
     if not user_id:
         return jsonify({'success': False, 'error': 'Not authenticated'}), 401
     
     try:
-        from models import Habit, HabitCheckin
-        today = datetime.datetime.now().date()
-        habits = Habit.query.filter_by(user_id=user_id).all()
-        
-        today_habits = []
-        for habit in habits:
-            if habit.frequency == 'daily':
-                if habit.start_date.date() <= today:
-                    today_habits.append(habit)
-            elif habit.frequency == 'weekly':
-                if habit.start_date.date() <= today and habit.start_date.weekday() == today.weekday():
-                    today_habits.append(habit)
-        
         result_habits = []
-        for habit in today_habits:
+        for habit, today_checkin, streak in build_today_view(user_id):
             habit_dict = habit.to_dict()
-            
-            today_checkin = HabitCheckin.query.filter_by(
-                habit_id=habit.id,
-                checkin_date=datetime.datetime.combine(today, datetime.datetime.min.time())
-            ).first()
-            
             habit_dict['checked_in_today'] = today_checkin.status if today_checkin else 'pending'
             habit_dict['today_checkin_id'] = today_checkin.id if today_checkin else None
-            habit_dict['current_streak'] = calculate_streak(habit.id)
-            
+            habit_dict['current_streak'] = streak
             result_habits.append(habit_dict)
         
         return jsonify({
@@ -234,64 +366,50 @@ def get_today_habits():
         print(f"Get today habits error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to fetch today\'s habits'}), 500
 
+@conditional_get('completed-today')
 def get_completed_today_habits():
     user_id = get_current_user_id()
     if not user_id:
         return jsonify({'success': False, 'error': 'Not authenticated'}), 401
     
     try:
-        from models import HabitCheckin
-        today = datetime.datetime.now().date()
-        
-        # Get habits that were completed today
-        completed_checkins = HabitCheckin.query.filter(
-            HabitCheckin.checkin_date >= datetime.datetime.combine(today, datetime.datetime.min.time()),
-            HabitCheckin.checkin_date < datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.datetime.min.time()),
+        from models import Habit, HabitCheckin
+        today = user_today()
+        
+        # Join to the user's habits in SQL so only their check-ins are read, and
+        # select just the serialized columns
+        projection = projection_for(Habit)
+        completed_habits = projection.select(Habit.query).join(
+            HabitCheckin, HabitCheckin.habit_id == Habit.id
+        ).filter(
+            Habit.user_id == user_id,
+            HabitCheckin.checkin_date >= day_start(today),
+            HabitCheckin.checkin_date < day_start(today + datetime.timedelta(days=1)),
             HabitCheckin.status == 'completed'
-        ).all()
-        
-        completed_habits = [checkin.habit for checkin in completed_checkins if checkin.habit.user_id == user_id]
+        ).order_by(HabitCheckin.id).all()
         
         return jsonify({
             'success': True,
-            'habits': [habit.to_dict() for habit in completed_habits]
+            'habits': projection.serialize_all(completed_habits)
         }), 200
         
     except Exception as e:
         print(f"Get completed habits error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to fetch completed habits'}), 500
 
+@conditional_get('failed-today')
 def get_failed_today_habits():
     user_id = get_current_user_id()
     if not user_id:
         return jsonify({'success': False, 'error': 'Not authenticated'}), 401
     
     try:
-        from models import Habit, HabitCheckin
-        today = datetime.datetime.now().date()
-        habits = Habit.query.filter_by(user_id=user_id).all()
-        
         failed_habits = []
-        for habit in habits:
-            # Check if habit should be done today
-            should_be_done = False
-            if habit.frequency == 'daily':
-                should_be_done = habit.start_date.date() <= today
-            elif habit.frequency == 'weekly':
-                should_be_done = (habit.start_date.date() <= today and 
-                                habit.start_date.weekday() == today.weekday())
-            
-            if should_be_done:
-                # Check if not completed today
-                today_checkin = HabitCheckin.query.filter_by(
-                    habit_id=habit.id,
-                    checkin_date=datetime.datetime.combine(today, datetime.datetime.min.time())
-                ).first()
-                
-                if not today_checkin or today_checkin.status != 'completed':
-                    habit_dict = habit.to_dict()
-                    habit_dict['current_streak'] = calculate_streak(habit.id)
-                    failed_habits.append(habit_dict)
+        for habit, today_checkin, streak in build_today_view(user_id):
+            if not today_checkin or today_checkin.status != 'completed':
+                habit_dict = habit.to_dict()
+                habit_dict['current_streak'] = streak
+                failed_habits.append(habit_dict)
         
         return jsonify({
             'success': True,
@@ -302,6 +420,7 @@ def get_failed_today_habits():
         print(f"Get failed habits error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to fetch failed habits'}), 500
 
+@retry_on_busy
 def mark_habit_done():
     user_id = get_current_user_id()
     if not user_id:
@@ -319,24 +438,30 @@ def mark_habit_done():
         if not habit:
             return jsonify({'success': False, 'error': 'Habit not found'}), 404
         
-        today = datetime.datetime.now().date()
-        
-        existing_checkin = HabitCheckin.query.filter_by(
-            habit_id=habit_id,
-            checkin_date=datetime.datetime.combine(today, datetime.datetime.min.time())
-        ).first()
-        
-        if existing_checkin:
-            return jsonify({'success': False, 'error': 'Habit already checked in today'}), 400
+        today = user_today()
+        ensure_rollup(user_id, today)
         
         new_checkin = HabitCheckin(
             habit_id=habit_id,
-            checkin_date=datetime.datetime.combine(today, datetime.datetime.min.time()),
+            checkin_date=day_start(today),
             status='completed',
             notes=data.get('notes', '')
         )
         
         db.session.add(new_checkin)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # uq_habit_checkins_habit_date: one check-in per habit per day
+            db.session.rollback()
+            return jsonify({'success': False, 'error': 'Habit already checked in today'}), 400
+        
+        set_completed(habit, today)
+        if not habit.record_completion(today):
+            habit.current_streak, habit.longest_streak, habit.last_completed_date = streak_counters(habit)
+            habit.keep_updated_at()
+        record_checkin(user_id, today, 'completed')
+        invalidate_user(user_id)
         db.session.commit()
         
         return jsonify({
@@ -351,6 +476,7 @@ def mark_habit_done():
         print(f"Mark habit done error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to mark habit as done'}), 500
 
+@retry_on_busy
 def delete_habit():
     user_id = get_current_user_id()
     if not user_id:
@@ -367,7 +493,9 @@ def delete_habit():
         if not habit:
             return jsonify({'success': False, 'error': 'Habit not found'}), 404
         
+        remove_habit(habit)
         db.session.delete(habit)
+        invalidate_user(user_id)
         db.session.commit()
         
         return jsonify({
@@ -381,17 +509,30 @@ def delete_habit():
         print(f"Delete habit error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to delete habit'}), 500
 
+@conditional_get('analytics')
+@cached_per_user('analytics')
+@read_replica('analytics')
 def get_user_analytics():
     user_id = get_current_user_id()
     if not user_id:
         return jsonify({'success': False, 'error': 'Not authenticated'}), 401
     
     try:
-        from models import Habit, HabitCheckin
-        habits = Habit.query.filter_by(user_id=user_id).all()
-        habit_ids = [habit.id for habit in habits]
+        from models import db, Habit
+        start, end = parse_date_range()
+        category = parse_category()
+        today = user_today()
         
-        if not habit_ids:
+        # Habit count and best live streak aggregated in SQL
+        habit_filter = [Habit.user_id == user_id]
+        if category:
+            habit_filter.append(Habit.category == category)
+        total_habits, current_streak = db.session.query(
+            db.func.count(Habit.id),
+            db.func.max(db.case((Habit.last_completed_date == today, Habit.current_streak), else_=0))
+        ).filter(*habit_filter).one()
+        
+        if not total_habits:
             return jsonify({
                 'success': True,
                 'analytics': {
@@ -403,57 +544,72 @@ def get_user_analytics():
                 }
             }), 200
         
-        total_checkins = HabitCheckin.query.filter(HabitCheckin.habit_id.in_(habit_ids)).count()
-        completed_checkins = HabitCheckin.query.filter(
-            HabitCheckin.habit_id.in_(habit_ids),
-            HabitCheckin.status == 'completed'
-        ).count()
+        if category is None and ensure_rollup(user_id, today):
+            db.session.commit()
         
-        success_rate = (completed_checkins / total_checkins * 100) if total_checkins > 0 else 0
+        weekday_totals = checkin_totals_by_weekday(user_id, start, end, category)
+        completed_checkins = sum(completed for completed, _ in weekday_totals.values())
+        total_checkins = completed_checkins + sum(skipped for _, skipped in weekday_totals.values())
         
-        best_day = calculate_best_day(habit_ids)
-        current_streak = max([calculate_streak(habit.id) for habit in habits]) if habits else 0
+        success_rate = (completed_checkins / total_checkins * 100) if total_checkins > 0 else 0
         
         return jsonify({
             'success': True,
             'analytics': {
                 'success_rate': round(success_rate, 1),
-                'total_habits': len(habits),
+                'total_habits': total_habits,
                 'completed_checkins': completed_checkins,
-                'current_streak': current_streak,
-                'best_day': best_day
+                'current_streak': current_streak or 0,
+                'best_day': calculate_best_day(weekday_totals)
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Analytics error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to fetch analytics'}), 500
 
+@conditional_get('calendar')
+@cached_per_user('calendar')
+@read_replica('calendar')
 def get_calendar_data():
     user_id = get_current_user_id()
     if not user_id:
         return jsonify({'success': False, 'error': 'Not authenticated'}), 401
     
     try:
-        from models import Habit, HabitCheckin
-        habits = Habit.query.filter_by(user_id=user_id).all()
-        habit_ids = [habit.id for habit in habits]
+        from models import db, Habit, HabitCheckin
         
-        if not habit_ids:
-            return jsonify({'success': True, 'calendar_data': []}), 200
+        # ?mode=heatmap: per-day counts for any range, aggregated server side
+        if request.args.get('mode') == 'heatmap':
+            start, end = parse_date_range()
+            end = end or user_today()
+            start = start or end - datetime.timedelta(days=DEFAULT_HEATMAP_DAYS - 1)
+            if start > end:
+                raise ValueError('from must not be after to')
+            if (end - start).days + 1 > MAX_HEATMAP_DAYS:
+                raise ValueError(f'Date range must be at most {MAX_HEATMAP_DAYS} days')
+            by_habit = request.args.get('by_habit', '').lower() in ('1', 'true')
+            return jsonify({
+                'success': True,
+                'heatmap': build_heatmap(user_id, start, end, by_habit)
+            }), 200
         
-        thirty_days_ago = datetime.datetime.now() - datetime.timedelta(days=30)
-        checkins = HabitCheckin.query.filter(
-            HabitCheckin.habit_id.in_(habit_ids),
+        thirty_days_ago = user_now() - datetime.timedelta(days=30)
+        checkins = db.session.query(HabitCheckin.checkin_date, Habit.name).join(
+            Habit, HabitCheckin.habit_id == Habit.id
+        ).filter(
+            Habit.user_id == user_id,
             HabitCheckin.status == 'completed',
             HabitCheckin.checkin_date >= thirty_days_ago
-        ).all()
+        ).order_by(HabitCheckin.id).all()
         
         calendar_data = []
-        for checkin in checkins:
+        for checkin_date, habit_name in checkins:
             calendar_data.append({
-                'date': checkin.checkin_date.strftime('%Y-%m-%d'),
-                'habit_name': checkin.habit.name,
+                'date': checkin_date.strftime('%Y-%m-%d'),
+                'habit_name': habit_name,
                 'count': 1
             })
         
@@ -462,29 +618,25 @@ def get_calendar_data():
             'calendar_data': calendar_data
         }), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Calendar data error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to fetch calendar data'}), 500
 
+@cached_per_user('motivational-quote')
 def get_motivational_quote():
     user_id = get_current_user_id()
     if not user_id:
         return jsonify({'success': False, 'error': 'Not authenticated'}), 401
     
     try:
-        from models import Habit, HabitCheckin
-        habits = Habit.query.filter_by(user_id=user_id).all()
-        habit_ids = [habit.id for habit in habits]
-        
-        seven_days_ago = datetime.datetime.now() - datetime.timedelta(days=7)
-        recent_checkins = HabitCheckin.query.filter(
-            HabitCheckin.habit_id.in_(habit_ids),
-            HabitCheckin.checkin_date >= seven_days_ago,
-            HabitCheckin.status == 'completed'
-        ).count()
+        from models import Habit
+        habits = Habit.query.filter_by(user_id=user_id).order_by(Habit.id).all()
         
-        total_possible = len(habits) * 7
-        recent_success_rate = (recent_checkins / total_possible * 100) if total_possible > 0 else 0
+        # Share of the last 7 days' due check-ins that were completed, from the bitmaps
+        today = user_today()
+        recent_success_rate = success_rate(habits, today - datetime.timedelta(days=6), today)
         
         quote = generate_motivational_quote(recent_success_rate, len(habits))
         
@@ -517,44 +669,34 @@ def get_motivational_quote():
             'category': quote['category']
         }), 200
 
+@conditional_get('daily-success')
+@cached_per_user('daily-success')
+@read_replica('daily-success')
 def get_daily_success_data():
     user_id = get_current_user_id()
     if not user_id:
         return jsonify({'success': False, 'error': 'Not authenticated'}), 401
     
     try:
-        from models import Habit, HabitCheckin
-        # Get last 7 days data
-        end_date = datetime.datetime.now().date()
-        start_date = end_date - datetime.timedelta(days=6)
+        from models import db, Habit
+        days = request.args.get('days', 7, type=int)
+        if days not in SUCCESS_WINDOWS:
+            return jsonify({'success': False, 'error': f'days must be one of {", ".join(map(str, SUCCESS_WINDOWS))}'}), 400
         
-        daily_data = []
-        current_date = start_date
+        end_date = user_today()
+        start_date = end_date - datetime.timedelta(days=days - 1)
         
-        while current_date <= end_date:
-            # Get total habits that should be done on this day
-            habits = Habit.query.filter_by(user_id=user_id).all()
-            total_possible = 0
-            completed = 0
-            
-            for habit in habits:
-                if habit.frequency == 'daily':
-                    if habit.start_date.date() <= current_date:
-                        total_possible += 1
-                elif habit.frequency == 'weekly':
-                    if habit.start_date.date() <= current_date and habit.start_date.weekday() == current_date.weekday():
-                        total_possible += 1
-            
-            # Get completed checkins for this day
-            if total_possible > 0:
-                checkins = HabitCheckin.query.filter(
-                    HabitCheckin.habit_id.in_([h.id for h in habits]),
-                    HabitCheckin.checkin_date >= datetime.datetime.combine(current_date, datetime.datetime.min.time()),
-                    HabitCheckin.checkin_date < datetime.datetime.combine(current_date + datetime.timedelta(days=1), datetime.datetime.min.time()),
-                    HabitCheckin.status == 'completed'
-                ).count()
-                completed = checkins
-            
+        habits = Habit.query.filter_by(user_id=user_id).order_by(Habit.id).all()
+        if ensure_rollup(user_id, end_date, habits):
+            db.session.commit()
+        rollup = read_rollup(user_id, start_date, end_date)
+        
+        daily_data = []
+        for offset in range(days):
+            current_date = start_date + datetime.timedelta(days=offset)
+            row = rollup.get(current_date)
+            total_possible = row.scheduled if row else 0
+            completed = row.completed if row and total_possible > 0 else 0
             success_rate = (completed / total_possible * 100) if total_possible > 0 else 0
             
             daily_data.append({
@@ -564,8 +706,6 @@ def get_daily_success_data():
                 'completed': completed,
                 'total': total_possible
             })
-            
-            current_date += datetime.timedelta(days=1)
         
         return jsonify({
             'success': True,
@@ -576,6 +716,7 @@ def get_daily_success_data():
         print(f"Get daily success data error: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to fetch daily success data'}), 500
 
+@conditional_get('by-category')
 def get_habits_by_category():
     user_id = get_current_user_id()
     if not user_id:
@@ -585,15 +726,296 @@ def get_habits_by_category():
         from models import Habit
         category = request.args.get('category')
         if category:
-            habits = Habit.query.filter_by(user_id=user_id, category=category).all()
+            habits = Habit.query.filter_by(user_id=user_id, category=category)
         else:
-            habits = Habit.query.filter_by(user_id=user_id).all()
+            habits = Habit.query.filter_by(user_id=user_id)
+        
+        return list_habits(habits)
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Get habits by category error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to fetch habits'}), 500
+
+@conditional_get('checkins')
+def get_checkin_history():
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Not authenticated'}), 401
+    
+    try:
+        from models import Habit, HabitCheckin
+        projection = projection_for(HabitCheckin)
+        query = projection.select(HabitCheckin.query).join(Habit, HabitCheckin.habit_id == Habit.id).filter(Habit.user_id == user_id)
+        
+        habit_id = request.args.get('habit_id', type=int)
+        if habit_id:
+            query = query.filter(HabitCheckin.habit_id == habit_id)
+        status = request.args.get('status')
+        if status:
+            query = query.filter(HabitCheckin.status == status)
+        
+        # Newest first; (checkin_date, id) is the keyset
+        query = query.order_by(HabitCheckin.checkin_date.desc(), HabitCheckin.id.desc())
+        
+        if wants_stream():
+            return ndjson_response(query, projection.serialize)
+        
+        limit, cursor = page_args()
+        if cursor:
+            checkin_date, checkin_id = parse_cursor(cursor, datetime.datetime.fromisoformat, int)
+            query = query.filter(
+                db_tuple(HabitCheckin.checkin_date, HabitCheckin.id) < db_tuple(checkin_date, checkin_id)
+            )
+        checkins, next_cursor = fetch_page(
+            query, limit, lambda checkin: [checkin.checkin_date.isoformat(), checkin.id]
+        )
         
         return jsonify({
             'success': True,
-            'habits': [habit.to_dict() for habit in habits]
+            'checkins': projection.serialize_all(checkins),
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
-        print(f"Get habits by category error: {str(e)}")
-        return jsonify({'success': False, 'error': 'Failed to fetch habits'}), 500
\ No newline at end of file
+        print(f"Get checkin history error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to fetch check-in history'}), 500
+
+def parse_bulk_checkin(item, today):
+    # Returns (habit_id, day, status, notes) or raises ValueError with the reason
+    if not isinstance(item, dict):
+        raise ValueError('Each check-in must be an object')
+    
+    habit_id = item.get('habit_id')
+    if not isinstance(habit_id, int) or isinstance(habit_id, bool):
+        raise ValueError('habit_id must be an integer')
+    
+    try:
+        day = datetime.date.fromisoformat(str(item.get('date', today.isoformat()))[:10])
+    except ValueError:
+        raise ValueError('Invalid date format')
+    if day > today:
+        raise ValueError('Cannot check in on a future date')
+    
+    status = item.get('status', 'completed')
+    if status not in CHECKIN_STATUSES:
+        raise ValueError(f'status must be one of {", ".join(CHECKIN_STATUSES)}')
+    
+    notes = item.get('notes') or ''
+    if not isinstance(notes, str):
+        raise ValueError('notes must be a string')
+    
+    return habit_id, day, status, notes
+
+@retry_on_busy
+def bulk_checkin():
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Not authenticated'}), 401
+    
+    try:
+        from models import db, Habit, HabitCheckin
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+        items = data.get('checkins')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'error': 'checkins must be a non-empty list'}), 400
+        if len(items) > MAX_BULK_CHECKINS:
+            return jsonify({'success': False, 'error': f'At most {MAX_BULK_CHECKINS} check-ins per request'}), 400
+        
+        today = user_today()
+        results = [None] * len(items)
+        parsed = {}
+        for index, item in enumerate(items):
+            try:
+                parsed[index] = parse_bulk_checkin(item, today)
+            except ValueError as e:
+                results[index] = {'index': index, 'status': 'invalid', 'error': str(e)}
+        
+        # Ownership for every referenced habit in one query
+        habit_ids = {habit_id for habit_id, _, _, _ in parsed.values()}
+        habits = {
+            habit.id: habit
+            for habit in Habit.query.filter(Habit.id.in_(habit_ids), Habit.user_id == user_id).all()
+        } if habit_ids else {}
+        
+        # Existing check-ins for the referenced habits and days in one query
+        days = {day for _, day, _, _ in parsed.values()}
+        existing = {}
+        if habits:
+            existing = {
+                (habit_id, checkin_date.date()): (checkin_id, checkin_status)
+                for checkin_id, habit_id, checkin_date, checkin_status in db.session.query(
+                    HabitCheckin.id, HabitCheckin.habit_id, HabitCheckin.checkin_date, HabitCheckin.status
+                ).filter(
+                    HabitCheckin.habit_id.in_(list(habits)),
+                    HabitCheckin.checkin_date.in_([day_start(day) for day in days])
+                ).all()
+            }
+        
+        rows = []
+        # Completions synced for days already recorded as skipped (e.g. by the nightly job) replace the skip
+        upgrades = []
+        for index, (habit_id, day, status, notes) in parsed.items():
+            habit = habits.get(habit_id)
+            if habit is None:
+                results[index] = {'index': index, 'status': 'not_found', 'error': 'Habit not found'}
+            elif day < habit.start_date.date():
+                results[index] = {'index': index, 'status': 'invalid', 'error': 'Date is before the habit start date'}
+            elif status == 'completed' and existing.get((habit_id, day), (None, None))[1] == 'skipped':
+                checkin_id = existing[(habit_id, day)][0]
+                existing[(habit_id, day)] = (checkin_id, 'completed')
+                upgrades.append({'checkin_id': checkin_id, 'habit_id': habit_id, 'day': day, 'notes': notes})
+                results[index] = {'index': index, 'status': 'updated', 'habit_id': habit_id, 'date': day.isoformat()}
+            elif (habit_id, day) in existing:
+                results[index] = {'index': index, 'status': 'duplicate', 'error': 'Habit already checked in on this date'}
+            else:
+                existing[(habit_id, day)] = (None, status)
+                rows.append({
+                    'habit_id': habit_id,
+                    'checkin_date': day_start(day),
+                    'status': status,
+                    'notes': notes
+                })
+                results[index] = {'index': index, 'status': 'created', 'habit_id': habit_id, 'date': day.isoformat()}
+        
+        if rows or upgrades:
+            ensure_rollup(user_id, today)
+            try:
+                if rows:
+                    db.session.execute(db.insert(HabitCheckin), rows)
+            except IntegrityError:
+                # A concurrent request inserted one of the same (habit, day) pairs
+                db.session.rollback()
+                return jsonify({'success': False, 'error': 'Conflicting check-ins were recorded concurrently, please retry'}), 409
+            
+            rollup_deltas = {}
+            completions = {}
+            for row in rows:
+                day = row['checkin_date'].date()
+                rollup_deltas[(day, row['status'])] = rollup_deltas.get((day, row['status']), 0) + 1
+                if row['status'] == 'completed':
+                    completions.setdefault(row['habit_id'], []).append(day)
+            
+            if upgrades:
+                checkins = HabitCheckin.__table__
+                db.session.execute(
+                    db.update(checkins).where(
+                        checkins.c.id == db.bindparam('checkin_id'),
+                        checkins.c.status == 'skipped'
+                    ).values(status='completed', notes=db.bindparam('notes')),
+                    [{'checkin_id': upgrade['checkin_id'], 'notes': upgrade['notes']} for upgrade in upgrades]
+                )
+                for upgrade in upgrades:
+                    day = upgrade['day']
+                    rollup_deltas[(day, 'skipped')] = rollup_deltas.get((day, 'skipped'), 0) - 1
+                    rollup_deltas[(day, 'completed')] = rollup_deltas.get((day, 'completed'), 0) + 1
+                    completions.setdefault(upgrade['habit_id'], []).append(day)
+            
+            record_checkins(user_id, rollup_deltas)
+            
+            # Completions newer than the stored streak extend it; anything older
+            # means the counters are recomputed from the updated bitmap
+            for habit_id, completed_days in completions.items():
+                habit = habits[habit_id]
+                for day in completed_days:
+                    set_completed(habit, day)
+                if not all(habit.record_completion(day) for day in sorted(completed_days)):
+                    habit.current_streak, habit.longest_streak, habit.last_completed_date = streak_counters(habit)
+                    habit.keep_updated_at()
+            
+            invalidate_user(user_id)
+            db.session.commit()
+        
+        created = sum(1 for result in results if result['status'] == 'created')
+        return jsonify({
+            'success': True,
+            'created': created,
+            'updated': sum(1 for result in results if result['status'] == 'updated'),
+            'duplicates': sum(1 for result in results if result['status'] == 'duplicate'),
+            'failed': sum(1 for result in results if result['status'] in ('invalid', 'not_found')),
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        from models import db
+        db.session.rollback()
+        print(f"Bulk checkin error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to record check-ins'}), 500
+
+def transfer_format(default=None):
+    # ?format=csv|ndjson, otherwise guessed from the request body's Content-Type
+    fmt = request.args.get('format')
+    if not fmt:
+        mimetype = request.mimetype or ''
+        fmt = 'csv' if 'csv' in mimetype else 'ndjson' if 'json' in mimetype else default
+    if fmt not in TRANSFER_FORMATS:
+        raise ValueError(f'format must be one of {", ".join(TRANSFER_FORMATS)}')
+    return fmt
+
+def import_habits():
+    # Habits and check-ins from a CSV or NDJSON upload (see services/transferService.py).
+    # The body is parsed as it arrives and written in batches, one transaction
+    # each. A failure part-way keeps the batches already imported; the response
+    # then has success: false with the summary of what was imported.
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Not authenticated'}), 401
+    
+    importer = None
+    try:
+        fmt = transfer_format()
+        importer = HabitImport(user_id, user_today(), current_app.config.get('IMPORT_BATCH_SIZE', 1000))
+        summary = importer.run(read_records(request.stream, fmt))
+        return jsonify({'success': True, **summary}), 200
+        
+    except ValueError as e:
+        # An unknown format, or an upload that stops being valid UTF-8 part-way
+        if importer is not None and importer.aborted:
+            return jsonify({'success': False, **importer.summary()}), 400
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        from models import db
+        db.session.rollback()
+        print(f"Import habits error: {str(e)}")
+        if importer is not None and (importer.habits or importer.checkins):
+            return jsonify({'success': False, **importer.summary()}), 207
+        return jsonify({'success': False, 'error': 'Failed to import habits'}), 500
+
+def export_habits():
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({'success': False, 'error': 'Not authenticated'}), 401
+    
+    try:
+        fmt = transfer_format(default='ndjson')
+        records = export_records(user_id, current_app.config.get('IMPORT_BATCH_SIZE', 1000))
+        chunks = format_records(records, fmt, current_app.json.dumps)
+        # The first chunk runs the habits query, so an early database error still gets a 500
+        first = next(chunks, '')
+        response = Response(
+            stream_with_context(export_stream(first, chunks)),
+            mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename=habits.{fmt}'
+        return response
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Export habits error: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to export habits'}), 500
+
+def export_stream(first, chunks):
+    # The response has started by now, so errors are logged here and end the stream
+    yield first
+    try:
+        yield from chunks
+    except Exception as e:
+        print(f"Export habits error: {str(e)}")
+        raise
@@ -1,8 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
+from services.replicaService import RoutingSession
 
-# Create db instance
-db = SQLAlchemy()
+# Create db instance; RoutingSession sends read-only views to the replica bind
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Import models after db is created
 from .userModel import User
-from .habitModel import Habit, HabitCheckin
\ No newline at end of file
+from .habitModel import Habit, HabitCheckin
+from .statsModel import DailyUserStats
+from .tokenModel import RevokedToken
+from .jobModel import JobLock
\ No newline at end of file
@@ -1,8 +1,17 @@
 from . import db
+from sqlalchemy.orm.attributes import flag_modified
 import datetime
 
+HABIT_FREQUENCIES = ('daily', 'weekly')
+HABIT_CATEGORIES = ('health', 'work', 'learning', 'Lifestyle', 'Fitness', 'Mental Wellness', 'Productivity')
+CHECKIN_STATUSES = ('completed', 'skipped')
+
 class Habit(db.Model):
     __tablename__ = 'habits'
+    __table_args__ = (
+        # Every habit listing filters by user, optionally by category
+        db.Index('ix_habits_user_id_category', 'user_id', 'category'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -15,9 +24,23 @@ class Habit(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
+    # Streak counters maintained on check-in so reads don't rescan history
+    current_streak = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    longest_streak = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    last_completed_date = db.Column(db.Date)
+    
+    # Completion history as a bitset keyed by day offset from start_date (see services/bitmapService.py)
+    completion_bitmap = db.Column(db.LargeBinary)
+    
     # Relationship with checkins
     checkins = db.relationship('HabitCheckin', backref='habit', lazy=True, cascade='all, delete-orphan')
     
+    @classmethod
+    def serialized_columns(cls):
+        # Columns read by to_dict, for queries that only need to serialize habits
+        return (cls.id, cls.user_id, cls.name, cls.frequency, cls.category, cls.start_date,
+                cls.target_duration, cls.note, cls.created_at, cls.updated_at)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -31,9 +54,46 @@ class Habit(db.Model):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+    
+    def streak_as_of(self, day):
+        # A streak only counts while it includes the given day
+        if self.last_completed_date == day:
+            return self.current_streak or 0
+        return 0
+    
+    def record_completion(self, day):
+        # Returns False when the day is older than the last completion (or extends a
+        # streak already reset), in which case the counters have to be rebuilt from history
+        last = self.last_completed_date
+        if last == day:
+            return True
+        if last is not None and day < last:
+            return False
+        
+        if last is not None and (day - last).days == 1:
+            if not self.current_streak:
+                # The nightly job ended this streak before the completion was synced
+                return False
+            self.current_streak += 1
+        else:
+            self.current_streak = 1
+        self.longest_streak = max(self.longest_streak or 0, self.current_streak)
+        self.last_completed_date = day
+        self.keep_updated_at()
+        return True
+    
+    def keep_updated_at(self):
+        # Streak bookkeeping is not an edit of the habit, so stop onupdate from bumping updated_at
+        flag_modified(self, 'updated_at')
 
 class HabitCheckin(db.Model):
     __tablename__ = 'habit_checkins'
+    __table_args__ = (
+        # One check-in per habit per day; also serves "today's check-in" and date-range lookups
+        db.Index('uq_habit_checkins_habit_date', 'habit_id', 'checkin_date', unique=True),
+        # Streak, analytics and calendar queries only look at completed check-ins
+        db.Index('ix_habit_checkins_habit_status_date', 'habit_id', 'status', 'checkin_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     habit_id = db.Column(db.Integer, db.ForeignKey('habits.id'), nullable=False)
@@ -42,6 +102,11 @@ class HabitCheckin(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     
+    @classmethod
+    def serialized_columns(cls):
+        # Columns read by to_dict, in its key order (see services/serializerService.py)
+        return (cls.id, cls.habit_id, cls.checkin_date, cls.status, cls.notes, cls.created_at)
+    
     def to_dict(self):
         return {
             'id': self.id,
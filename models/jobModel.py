@@ -0,0 +1,11 @@
+from . import db
+
+class JobLock(db.Model):
+    # One row per background job: which worker holds it and until when, and the
+    # last day the job has fully processed (see services/nightlyService.py)
+    __tablename__ = 'job_locks'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    owner = db.Column(db.String(64))
+    locked_until = db.Column(db.DateTime)
+    last_run_date = db.Column(db.Date)
@@ -0,0 +1,98 @@
+from . import db
+
+def _rebuild_streaks():
+    from services.streakService import rebuild_streaks
+    rebuild_streaks()
+
+def _rebuild_bitmaps():
+    from services.bitmapService import rebuild_bitmaps
+    rebuild_bitmaps()
+
+def _dedupe_checkins(conn):
+    # Keep the first check-in recorded for a habit on a given day
+    conn.exec_driver_sql(
+        'DELETE FROM habit_checkins WHERE id NOT IN '
+        '(SELECT MIN(id) FROM habit_checkins GROUP BY habit_id, checkin_date)'
+    )
+
+# Data backfills to run when a column is added to an existing database
+BACKFILLS = {
+    ('habits', 'current_streak'): _rebuild_streaks,
+    ('habits', 'completion_bitmap'): _rebuild_bitmaps,
+}
+
+def _rebuild_rollups():
+    from services.rollupService import rebuild_rollups
+    rebuild_rollups()
+
+# Data migrations for derived data whose rules changed, applied in order and
+# tracked with SQLite's user_version pragma
+DATA_MIGRATIONS = [
+    # 1: habits stop being scheduled after start_date + target_duration
+    _rebuild_rollups,
+]
+
+# Data fixes that must run before an index can be created on an existing database
+BEFORE_INDEX = {
+    'uq_habit_checkins_habit_date': _dedupe_checkins,
+}
+
+def add_missing_columns():
+    # db.create_all() only creates missing tables, so columns added to a model
+    # after the database file was created are appended here with ALTER TABLE
+    inspector = db.inspect(db.engine)
+    compiler = db.engine.dialect.ddl_compiler(db.engine.dialect, None)
+    added = []
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                spec = compiler.get_column_specification(column)
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {spec}')
+                added.append((table.name, column.name))
+
+    return added
+
+def create_missing_indexes():
+    inspector = db.inspect(db.engine)
+    created = []
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                before = BEFORE_INDEX.get(index.name)
+                if before:
+                    before(conn)
+                index.create(conn)
+                created.append(index.name)
+
+    return created
+
+def run_data_migrations():
+    with db.engine.connect() as conn:
+        version = conn.exec_driver_sql('PRAGMA user_version').scalar()
+    for number, migration in enumerate(DATA_MIGRATIONS[version:], start=version + 1):
+        migration()
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql(f'PRAGMA user_version = {number}')
+    return len(DATA_MIGRATIONS) - min(version, len(DATA_MIGRATIONS))
+
+def upgrade_schema():
+    added = add_missing_columns()
+    create_missing_indexes()
+    for key in added:
+        backfill = BACKFILLS.get(key)
+        if backfill:
+            backfill()
+    run_data_migrations()
+    return added
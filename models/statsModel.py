@@ -0,0 +1,20 @@
+from . import db
+
+class DailyUserStats(db.Model):
+    # Per-user daily rollup of scheduled habits and check-ins, maintained on write
+    # by services.rollupService so analytics never rescan habit_checkins
+    __tablename__ = 'daily_user_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    scheduled = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    skipped = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'scheduled': self.scheduled,
+            'completed': self.completed,
+            'skipped': self.skipped
+        }
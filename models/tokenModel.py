@@ -0,0 +1,10 @@
+from . import db
+import datetime
+
+class RevokedToken(db.Model):
+    # Revocation list for signed auth tokens; rows can be pruned once expired
+    __tablename__ = 'revoked_tokens'
+    
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=False, index=True)
@@ -1,6 +1,6 @@
 from . import db
 import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from services.passwordService import hash_password, verify_password, password_needs_rehash
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -11,21 +11,35 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    # IANA name such as 'Asia/Kolkata'; decides which day "today" is for the user
+    # (NULL falls back to DEFAULT_TIMEZONE, see services/timezoneService.py)
+    timezone = db.Column(db.String(64))
+    # UNIX time of the last write to the user's habits or check-ins, bumped in the
+    # same transaction (services/cacheService.py); keys caches, ETags and
+    # read-your-writes routing consistently across worker processes
+    data_version = db.Column(db.Float)
     
     # Relationship with habits - use string reference to avoid circular import
     habits = db.relationship('Habit', backref='user', lazy=True, cascade='all, delete-orphan')
     
+    # Hashing runs in the bounded pool from services.passwordService and raises
+    # HashingBusy when it is saturated
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_upgrade(self):
+        # True when the stored hash was made with a different algorithm or cost
+        return password_needs_rehash(self.password_hash)
     
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
             'email': self.email,
+            'timezone': self.timezone,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -1,5 +1,5 @@
 from flask import Blueprint
-from controllers.authController import register_user, login_user, logout_user, get_current_user
+from controllers.authController import register_user, login_user, logout_user, get_current_user, update_current_user, refresh_tokens
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -7,4 +7,6 @@ auth_bp = Blueprint('auth', __name__)
 auth_bp.route('/register', methods=['POST'])(register_user)
 auth_bp.route('/login', methods=['POST'])(login_user)
 auth_bp.route('/logout', methods=['POST'])(logout_user)
-auth_bp.route('/me', methods=['GET'])(get_current_user)
\ No newline at end of file
+auth_bp.route('/me', methods=['GET'])(get_current_user)
+auth_bp.route('/me', methods=['PATCH'])(update_current_user)
+auth_bp.route('/refresh', methods=['POST'])(refresh_tokens)
\ No newline at end of file
@@ -3,7 +3,8 @@ from controllers.habitController import (
     create_habit, get_user_habits, get_today_habits, mark_habit_done, 
     delete_habit, get_user_analytics, get_calendar_data, get_motivational_quote,
     get_completed_today_habits, get_failed_today_habits, get_daily_success_data,
-    get_habits_by_category
+    get_habits_by_category, get_checkin_history, bulk_checkin,
+    import_habits, export_habits
 )
 
 habit_bp = Blueprint('habits', __name__)
@@ -24,6 +25,14 @@ habit_bp.route('/daily-success', methods=['GET'])(get_daily_success_data)
 habit_bp.route('/completed-today', methods=['GET'])(get_completed_today_habits)
 habit_bp.route('/failed-today', methods=['GET'])(get_failed_today_habits)
 
+# Check-in history
+habit_bp.route('/checkins', methods=['GET'])(get_checkin_history)
+habit_bp.route('/checkins/bulk', methods=['POST'])(bulk_checkin)
+
+# Import / export
+habit_bp.route('/import', methods=['POST'])(import_habits)
+habit_bp.route('/export', methods=['GET'])(export_habits)
+
 # Category routes
 habit_bp.route('/by-category', methods=['GET'])(get_habits_by_category)
 
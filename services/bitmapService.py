@@ -0,0 +1,152 @@
+import datetime
+from services.scheduleService import due_mask, habit_start
+
+# Each habit keeps its completion history in habits.completion_bitmap: bit i is
+# set when the habit was completed on start_date + i days, stored little-endian.
+# A year of history is 46 bytes, and streaks, weekday histograms and windowed
+# rates become big-int operations instead of scans over habit_checkins.
+# Completions dated before start_date can't be represented and are left out.
+
+def decode(blob):
+    return int.from_bytes(blob, 'little') if blob else 0
+
+def encode(mask):
+    return mask.to_bytes((mask.bit_length() + 7) // 8, 'little') if mask else None
+
+def popcount(mask):
+    return bin(mask).count('1')
+
+def day_offset(habit, day):
+    return (day - habit_start(habit)).days
+
+def completion_mask(habit):
+    return decode(habit.completion_bitmap)
+
+def set_completed(habit, day, completed=True):
+    offset = day_offset(habit, day)
+    if offset < 0:
+        return False
+    mask = completion_mask(habit)
+    mask = mask | (1 << offset) if completed else mask & ~(1 << offset)
+    habit.completion_bitmap = encode(mask)
+    return True
+
+def window_mask(habit, start, end):
+    # The habit's completions in [start, end], re-based so bit 0 is `start`
+    mask = completion_mask(habit)
+    first = day_offset(habit, start)
+    days = (end - start).days + 1
+    if first >= 0:
+        mask >>= first
+    else:
+        mask <<= -first
+    return mask & ((1 << days) - 1) if days > 0 else 0
+
+def window_counts(habit, start, end):
+    # (completed days, due days) for the habit between start and end (inclusive)
+    days = (end - start).days + 1
+    if days <= 0:
+        return 0, 0
+    due = due_mask(habit, start, days)
+    return popcount(window_mask(habit, start, end) & due), popcount(due)
+
+def success_rate(habits, start, end):
+    # Percentage of due days completed across habits in the window
+    completed = due = 0
+    for habit in habits:
+        habit_completed, habit_due = window_counts(habit, start, end)
+        completed += habit_completed
+        due += habit_due
+    return completed / due * 100 if due else 0
+
+def streak_ending_at(mask, offset):
+    # Consecutive set bits ending at `offset`
+    if offset < 0 or not (mask >> offset) & 1:
+        return 0
+    below = (1 << (offset + 1)) - 1
+    gaps = ~mask & below
+    return offset - (gaps.bit_length() - 1) if gaps else offset + 1
+
+def longest_run(mask):
+    # Each step shortens every run of ones by one bit
+    length = 0
+    while mask:
+        mask &= mask >> 1
+        length += 1
+    return length
+
+def streak_counters(habit):
+    # (current streak, longest streak, last completion) in the shape of
+    # streakService.compute_streak_counters
+    mask = completion_mask(habit)
+    if not mask:
+        return 0, 0, None
+    last = mask.bit_length() - 1
+    return (
+        streak_ending_at(mask, last),
+        longest_run(mask),
+        habit_start(habit) + datetime.timedelta(days=last)
+    )
+
+def bitmaps_from_checkins(habits, habit_ids=None, batch_size=500):
+    # {habit_id: bitmask} rebuilt from completed check-in rows, streamed
+    from models import db, HabitCheckin
+    masks = {habit_id: 0 for habit_id in habits}
+    query = db.session.query(HabitCheckin.habit_id, HabitCheckin.checkin_date).filter(
+        HabitCheckin.status == 'completed'
+    )
+    if habit_ids is not None:
+        query = query.filter(HabitCheckin.habit_id.in_(habit_ids))
+    for habit_id, checkin_date in query.yield_per(batch_size):
+        if habit_id not in habits:
+            continue
+        offset = day_offset(habits[habit_id], checkin_date.date())
+        if offset >= 0:
+            masks[habit_id] |= 1 << offset
+    return masks
+
+def check_bitmaps(habit_ids=None, fix=False, commit=True):
+    # Compares every habit's bitmap with its completed check-in rows. Returns
+    # {habit_id: (missing days, unexpected days)} for the habits that differ and,
+    # with fix=True, rewrites their bitmaps from the rows.
+    from models import db, Habit
+
+    query = Habit.query
+    if habit_ids is not None:
+        if not habit_ids:
+            return {}
+        query = query.filter(Habit.id.in_(habit_ids))
+    habits = {habit.id: habit for habit in query.all()}
+    if not habits:
+        return {}
+    expected_masks = bitmaps_from_checkins(habits, habit_ids)
+
+    mismatches = {}
+    for habit_id, habit in habits.items():
+        expected = expected_masks[habit_id]
+        stored = completion_mask(habit)
+        if expected == stored:
+            continue
+        start = habit_start(habit)
+        mismatches[habit.id] = (
+            [start + datetime.timedelta(days=offset) for offset in bit_offsets(expected & ~stored)],
+            [start + datetime.timedelta(days=offset) for offset in bit_offsets(stored & ~expected)]
+        )
+        if fix:
+            habit.completion_bitmap = encode(expected)
+            habit.keep_updated_at()
+
+    if fix and commit:
+        db.session.commit()
+    return mismatches
+
+def rebuild_bitmaps(habit_ids=None, commit=True):
+    return len(check_bitmaps(habit_ids, fix=True, commit=commit))
+
+def bit_offsets(mask):
+    offsets = []
+    while mask:
+        low = mask & -mask
+        offsets.append(low.bit_length() - 1)
+        mask ^= low
+    return offsets
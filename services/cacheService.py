@@ -0,0 +1,270 @@
+from flask import current_app, g, has_request_context, request
+from collections import OrderedDict
+import datetime
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Cache backends store JSON-serializable values with a TTL. Keys embed the user's
+# data version (users.data_version), which every write to their habits or
+# check-ins bumps in its own transaction, so invalidating a user is a single
+# version bump that every worker sees, and stale entries simply age out.
+
+class MemoryCacheBackend:
+    # Process-local LRU cache
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteCacheBackend:
+    # Cache shared by every worker process on the host through a SQLite file
+    def __init__(self, path, max_entries=2048):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self.evictions = 0
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries (accessed_at)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute('SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+            return None
+        conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), now + ttl, now)
+        )
+        overflow = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                'DELETE FROM cache_entries WHERE key IN '
+                '(SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)',
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM cache_entries')
+
+
+class HabitCache:
+    def __init__(self, backend, default_ttl=60):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def make_key(self, user_id, endpoint, query_string=b''):
+        if isinstance(query_string, bytes):
+            query_string = query_string.decode('utf-8', 'replace')
+        return f'{user_id}:{endpoint}:{view_version(user_id)!r}:{query_string}'
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, ttl or self.default_ttl)
+
+    def count_invalidations(self, count=1):
+        with self._lock:
+            self.invalidations += count
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0,
+            'invalidations': self.invalidations,
+            'evictions': self.backend.evictions
+        }
+
+
+def create_backend(app):
+    backend = app.config.get('CACHE_BACKEND', 'memory')
+    max_entries = app.config.get('CACHE_MAX_ENTRIES', 2048)
+    if backend == 'memory':
+        return MemoryCacheBackend(max_entries)
+    if backend == 'sqlite':
+        path = app.config.get('CACHE_SQLITE_PATH') or 'habithero-cache.db'
+        if not os.path.isabs(path):
+            os.makedirs(app.instance_path, exist_ok=True)
+            path = os.path.join(app.instance_path, path)
+        return SqliteCacheBackend(path, max_entries)
+    if backend == 'null':
+        return None
+    raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+def init_cache(app):
+    backend = create_backend(app)
+    cache = HabitCache(backend, app.config.get('CACHE_DEFAULT_TTL', 60)) if backend else None
+    app.extensions['habit_cache'] = cache
+    return cache
+
+def get_cache():
+    return current_app.extensions.get('habit_cache')
+
+def data_version(user_id):
+    # UNIX time of the user's last write (0 before the first one), read from the
+    # primary once per request
+    versions = g.setdefault('data_versions', {}) if has_request_context() else {}
+    if user_id not in versions:
+        from models import db, User
+        version = db.session.query(User.data_version).filter(User.id == user_id).scalar()
+        versions[user_id] = version or 0.0
+    return versions[user_id]
+
+def view_version(user_id):
+    # Version of the user's views, shared by cache keys and ETags: the data
+    # version, but never older than the start of the user's current day, since
+    # views that depend on "today" change at their midnight even when no data did
+    from services.timezoneService import current_timezone, day_start_timestamp
+    return max(data_version(user_id), day_start_timestamp(current_timezone()))
+
+def invalidate_users(user_ids):
+    # Bumps the data version of the users inside the caller's transaction, so the
+    # new version becomes visible to every worker together with the write.
+    # Call before db.session.commit().
+    from models import db, User
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    db.session.execute(
+        db.update(User).where(User.id.in_(user_ids)).values(
+            # Strictly increasing even if the clock doesn't move between bumps
+            data_version=db.func.max(db.func.coalesce(User.data_version, 0) + 1e-6, time.time()),
+            updated_at=User.updated_at
+        ).execution_options(synchronize_session=False)
+    )
+    if has_request_context():
+        for user_id in user_ids:
+            g.get('data_versions', {}).pop(user_id, None)
+    cache = get_cache()
+    if cache is not None:
+        cache.count_invalidations(len(user_ids))
+
+def invalidate_user(user_id):
+    invalidate_users([user_id])
+
+def cached_per_user(endpoint, ttl=None):
+    # Caches successful JSON responses per user, endpoint and query string until
+    # the user's data changes (see invalidate_user) or the TTL expires
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            from services.tokenService import current_user_id
+            user_id = current_user_id()
+            if cache is None or not user_id:
+                return view(*args, **kwargs)
+
+            key = cache.make_key(user_id, endpoint, request.query_string)
+            cached = cache.get(key)
+            if cached is not None:
+                return current_app.response_class(cached, status=200, mimetype='application/json')
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                cache.set(key, response.get_data(as_text=True), ttl)
+            return response
+        return wrapper
+    return decorator
+
+
+def user_validators(user_id, endpoint):
+    # (ETag, last modified timestamp) for a user's view
+    version = view_version(user_id)
+    query_string = request.query_string.decode('utf-8', 'replace')
+    digest = hashlib.sha1(f'{user_id}:{endpoint}:{version!r}:{query_string}'.encode()).hexdigest()
+    return digest[:32], version
+
+def conditional_get(endpoint):
+    # Tags successful responses with an ETag and Last-Modified derived from the
+    # user's data version, and answers a matching If-None-Match with 304 before
+    # the view (or its cache lookup) runs. Responses are private and must be
+    # revalidated on every use.
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from services.tokenService import current_user_id
+            user_id = current_user_id()
+            if not user_id:
+                return view(*args, **kwargs)
+
+            etag, version = user_validators(user_id, endpoint)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.last_modified = datetime.datetime.fromtimestamp(version, datetime.timezone.utc)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
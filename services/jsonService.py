@@ -0,0 +1,59 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Pluggable JSON encoding for jsonify/app.json. JSON_PROVIDER picks 'stdlib'
+# (Flask's default), 'orjson', or 'auto' (orjson when it is installed). Both
+# providers sort keys and fall back to Flask's default() for values JSON can't
+# represent natively, so the output decodes to the same documents.
+
+class OrjsonProvider(DefaultJSONProvider):
+    options = 0
+
+    def __init__(self, app):
+        super().__init__(app)
+        if orjson is None:
+            raise RuntimeError('JSON_PROVIDER=orjson needs the orjson package')
+        # Dates and dataclasses go through default() as they do in Flask's provider
+        self.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            self.options |= orjson.OPT_SORT_KEYS
+
+    def encode(self, obj, indent=False):
+        options = self.options | orjson.OPT_INDENT_2 if indent else self.options
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {'indent', 'separators'}:
+            # Options orjson doesn't have (cls, ensure_ascii, ...) get the stdlib encoder
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj, bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hands orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.encode(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'stdlib': DefaultJSONProvider,
+    'orjson': OrjsonProvider
+}
+
+def init_json(app):
+    name = app.config.get('JSON_PROVIDER', 'auto')
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f'Unknown JSON_PROVIDER: {name}')
+    app.json = JSON_PROVIDERS[name](app)
+    return app.json
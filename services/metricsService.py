@@ -0,0 +1,161 @@
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+import threading
+import time
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class MetricsRegistry:
+    # Per-endpoint request, SQL and timing counters
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.responses = {}
+
+    def _endpoint(self, endpoint):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = {
+                'requests': 0,
+                'queries': 0,
+                'db_seconds': 0.0,
+                'handler_seconds': 0.0,
+                'slow_queries': 0,
+                'n_plus_one': 0,
+                'buckets': [0] * len(DURATION_BUCKETS)
+            }
+        return stats
+
+    def record_request(self, endpoint, method, status, queries, db_seconds, handler_seconds):
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats['requests'] += 1
+            stats['queries'] += queries
+            stats['db_seconds'] += db_seconds
+            stats['handler_seconds'] += handler_seconds
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if handler_seconds <= bound:
+                    stats['buckets'][index] += 1
+            key = (endpoint, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def record_event(self, endpoint, name):
+        with self._lock:
+            self._endpoint(endpoint)[name] += 1
+
+    def render_prometheus(self, cache_stats=None):
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            endpoints = {name: dict(stats, buckets=list(stats['buckets'])) for name, stats in self.endpoints.items()}
+            responses = dict(self.responses)
+
+        metric('habithero_http_requests_total', 'counter', 'HTTP requests by endpoint, method and status.')
+        for (endpoint, method, status), count in sorted(responses.items()):
+            lines.append(f'habithero_http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        metric('habithero_request_duration_seconds', 'histogram', 'Handler time per request.')
+        for endpoint, stats in sorted(endpoints.items()):
+            for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+                lines.append(f'habithero_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'habithero_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {stats["requests"]}')
+            lines.append(f'habithero_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats["handler_seconds"]:.6f}')
+            lines.append(f'habithero_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats["requests"]}')
+
+        for name, key, kind, help_text, fmt in (
+            ('habithero_db_queries_total', 'queries', 'counter', 'SQL statements executed.', '{}'),
+            ('habithero_db_duration_seconds_total', 'db_seconds', 'counter', 'Time spent executing SQL.', '{:.6f}'),
+            ('habithero_slow_queries_total', 'slow_queries', 'counter', 'Statements slower than SLOW_QUERY_MS.', '{}'),
+            ('habithero_n_plus_one_total', 'n_plus_one', 'counter', 'Requests that repeated one statement more than N_PLUS_ONE_THRESHOLD times.', '{}'),
+        ):
+            metric(name, kind, help_text)
+            for endpoint, stats in sorted(endpoints.items()):
+                lines.append(f'{name}{{endpoint="{endpoint}"}} ' + fmt.format(stats[key]))
+
+        if cache_stats:
+            metric('habithero_cache_hits_total', 'counter', 'Analytics cache hits.')
+            lines.append(f'habithero_cache_hits_total {cache_stats["hits"]}')
+            metric('habithero_cache_misses_total', 'counter', 'Analytics cache misses.')
+            lines.append(f'habithero_cache_misses_total {cache_stats["misses"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def current_route():
+    if not has_request_context():
+        return None
+    return request.endpoint or request.path
+
+def init_metrics(app):
+    from models import db
+
+    registry = MetricsRegistry()
+    app.extensions['habit_metrics'] = registry
+    slow_query_seconds = app.config.get('SLOW_QUERY_MS', 100) / 1000
+    n_plus_one_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+    logger = app.logger
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        elapsed = time.perf_counter() - started
+        if not has_request_context() or 'request_metrics' not in g:
+            return
+        metrics = g.request_metrics
+        metrics['queries'] += 1
+        metrics['db_seconds'] += elapsed
+        metrics['statements'][statement] = metrics['statements'].get(statement, 0) + 1
+        if elapsed >= slow_query_seconds:
+            registry.record_event(current_route(), 'slow_queries')
+            logger.warning('Slow query (%.1f ms) in %s %s: %s', elapsed * 1000, request.method, current_route(), statement)
+
+    def handle_error(conn_context):
+        # Keep the timing stack balanced when a statement raises
+        started = conn_context.connection.info.get('query_started') if conn_context.connection is not None else None
+        if started:
+            started.pop()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+            event.listen(engine, 'handle_error', handle_error)
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = {'started': time.perf_counter(), 'queries': 0, 'db_seconds': 0.0, 'statements': {}}
+
+    @app.after_request
+    def record_request_metrics(response):
+        metrics = g.pop('request_metrics', None)
+        if metrics is None:
+            return response
+        route = current_route()
+        registry.record_request(
+            route, request.method, response.status_code,
+            metrics['queries'], metrics['db_seconds'], time.perf_counter() - metrics['started']
+        )
+        repeated = [(statement, count) for statement, count in metrics['statements'].items() if count > n_plus_one_threshold]
+        if repeated:
+            registry.record_event(route, 'n_plus_one')
+            for statement, count in repeated:
+                logger.warning('Possible N+1 in %s %s: statement ran %d times: %s', request.method, route, count, statement)
+        return response
+
+    return registry
+
+def metrics_response(app):
+    from services.cacheService import get_cache
+    cache = get_cache()
+    registry = app.extensions['habit_metrics']
+    return Response(
+        registry.render_prometheus(cache.stats() if cache else None),
+        mimetype='text/plain; version=0.0.4'
+    )
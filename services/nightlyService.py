@@ -0,0 +1,234 @@
+import datetime
+import threading
+import uuid
+from services.scheduleService import day_start, due_days, due_mask
+
+# Nightly batch: every scheduled day that ended without a check-in gets a
+# 'skipped' row, streaks that missed a day are reset to zero, and the daily
+# rollups and response caches of the affected users are refreshed. Each night is
+# processed once. A row in job_locks elects a single runner across every worker
+# process and records the last finished day, so a restarted or late scheduler
+# catches up on the days it missed.
+
+NIGHTLY_JOB = 'nightly'
+
+def acquire_lock(name, owner, ttl_seconds):
+    # True when `owner` now holds the lock (also extends a lock it already holds)
+    from models import db, JobLock
+    now = datetime.datetime.utcnow()
+    db.session.execute(db.insert(JobLock).prefix_with('OR IGNORE'), {'name': name})
+    result = db.session.execute(
+        db.update(JobLock).where(
+            JobLock.name == name,
+            db.or_(JobLock.locked_until.is_(None), JobLock.locked_until < now, JobLock.owner == owner)
+        ).values(owner=owner, locked_until=now + datetime.timedelta(seconds=ttl_seconds))
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+def release_lock(name, owner):
+    from models import db, JobLock
+    db.session.execute(
+        db.update(JobLock).where(JobLock.name == name, JobLock.owner == owner).values(owner=None, locked_until=None)
+    )
+    db.session.commit()
+
+def last_run_date(name=NIGHTLY_JOB):
+    from models import db, JobLock
+    return db.session.query(JobLock.last_run_date).filter(JobLock.name == name).scalar()
+
+def insert_missed_checkins(since, through, batch_size=500):
+    # Bulk-inserts a 'skipped' row for every due day in [since, through] without a
+    # check-in and adjusts the materialized rollup rows to match, one batch of
+    # habits per transaction. Returns {user_id: rows inserted}.
+    from models import db, Habit, HabitCheckin, DailyUserStats
+    days = (through - since).days + 1
+    if days <= 0:
+        return {}
+
+    stats = DailyUserStats.__table__
+    rollup_update = db.update(stats).where(
+        stats.c.user_id == db.bindparam('target_user'),
+        stats.c.date == db.bindparam('target_date')
+    ).values(skipped=stats.c.skipped + db.bindparam('delta'))
+
+    inserted = {}
+    last_id = 0
+    while True:
+        habits = db.session.query(
+            Habit.id, Habit.user_id, Habit.frequency, Habit.start_date, Habit.target_duration
+        ).filter(
+            Habit.id > last_id,
+            Habit.start_date < day_start(through + datetime.timedelta(days=1))
+        ).order_by(Habit.id).limit(batch_size).all()
+        if not habits:
+            break
+        last_id = habits[-1].id
+
+        recorded = {}
+        for habit_id, checkin_date in db.session.query(HabitCheckin.habit_id, HabitCheckin.checkin_date).filter(
+            HabitCheckin.habit_id.in_([habit.id for habit in habits]),
+            HabitCheckin.checkin_date >= day_start(since),
+            HabitCheckin.checkin_date < day_start(through + datetime.timedelta(days=1))
+        ):
+            recorded[habit_id] = recorded.get(habit_id, 0) | 1 << (checkin_date.date() - since).days
+
+        owners = {}
+        rows = []
+        for habit in habits:
+            owners[habit.id] = habit.user_id
+            missed = due_mask(habit, since, days) & ~recorded.get(habit.id, 0)
+            rows.extend(
+                {'habit_id': habit.id, 'checkin_date': day_start(day), 'status': 'skipped', 'notes': ''}
+                for day in due_days(missed, since)
+            )
+        if not rows:
+            continue
+
+        # OR IGNORE: a check-in recorded since the read above wins; RETURNING tells
+        # which rows actually went in so the rollup deltas stay exact
+        created = db.session.execute(
+            db.insert(HabitCheckin).prefix_with('OR IGNORE').returning(HabitCheckin.habit_id, HabitCheckin.checkin_date),
+            rows
+        ).all()
+        deltas = {}
+        for habit_id, checkin_date in created:
+            key = (owners[habit_id], checkin_date.date())
+            deltas[key] = deltas.get(key, 0) + 1
+        if deltas:
+            db.session.execute(rollup_update, [
+                {'target_user': user_id, 'target_date': day, 'delta': delta}
+                for (user_id, day), delta in deltas.items()
+            ])
+        db.session.commit()
+
+        for (user_id, _), delta in deltas.items():
+            inserted[user_id] = inserted.get(user_id, 0) + delta
+    return inserted
+
+def finalize_streaks(through):
+    # Zeroes current streaks whose last completion is before `through`; returns the owners
+    from models import db, Habit
+    rows = db.session.execute(
+        db.update(Habit).where(
+            Habit.current_streak > 0,
+            db.or_(Habit.last_completed_date.is_(None), Habit.last_completed_date < through)
+        ).values(
+            current_streak=0,
+            # Not an edit of the habit, so keep onupdate from touching updated_at
+            updated_at=Habit.updated_at
+        ).returning(Habit.user_id).execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return {user_id for user_id, in rows}
+
+def last_ended_day():
+    # The latest day that is over in every user's timezone (one DISTINCT query)
+    from models import db, User
+    from services.timezoneService import default_timezone, local_today
+    zones = {name or default_timezone() for name, in db.session.query(User.timezone).distinct()}
+    today = min((local_today(name) for name in zones), default=local_today(default_timezone()))
+    return today - datetime.timedelta(days=1)
+
+def run_nightly(through=None, since=None, owner=None):
+    # Processes every day after the last finished one through `through` (default
+    # the last day that has ended for every user), or exactly [since, through]
+    # when `since` is given. Returns a summary, or None when another worker holds
+    # the lock or there is nothing to do. Must be called inside an app context.
+    from flask import current_app
+    from models import db, User, JobLock
+    from services.rollupService import ensure_rollup
+    from services.cacheService import invalidate_users
+    from services.timezoneService import default_timezone, local_today
+
+    through = through or last_ended_day()
+    owner = owner or uuid.uuid4().hex
+    if not acquire_lock(NIGHTLY_JOB, owner, current_app.config.get('NIGHTLY_LOCK_SECONDS', 1800)):
+        return None
+    try:
+        last = last_run_date()
+        if since is None:
+            if last is not None and last >= through:
+                return None
+            # The first run only finalizes the day before; older history is left as it is
+            since = last + datetime.timedelta(days=1) if last else through
+
+        skipped = insert_missed_checkins(since, through, current_app.config.get('NIGHTLY_BATCH_SIZE', 500))
+        reset = finalize_streaks(through)
+        users = set(skipped) | reset
+        timezones = dict(db.session.query(User.id, User.timezone).filter(User.id.in_(users)).all()) if users else {}
+        for user_id in users:
+            ensure_rollup(user_id, local_today(timezones.get(user_id) or default_timezone()))
+        db.session.query(JobLock).filter(JobLock.name == NIGHTLY_JOB).update(
+            {'last_run_date': max(last, through) if last else through}, synchronize_session=False
+        )
+        invalidate_users(users)
+        db.session.commit()
+        return {
+            'from': since.isoformat(),
+            'through': through.isoformat(),
+            'skipped_rows': sum(skipped.values()),
+            'streaks_reset': len(reset),
+            'users': len(users)
+        }
+    finally:
+        db.session.rollback()
+        release_lock(NIGHTLY_JOB, owner)
+
+
+class NightlyScheduler:
+    # Daemon thread that wakes every `check_seconds` and runs the nightly batch
+    # once the configured time of day has passed and the previous day is still
+    # unprocessed. Every worker may run one; the job lock picks a single runner.
+    def __init__(self, app, check_seconds=300, run_after=datetime.time(0, 5)):
+        self.app = app
+        self.check_seconds = check_seconds
+        self.run_after = run_after
+        self.owner = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='habithero-nightly', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_due(self):
+        if datetime.datetime.now().time() < self.run_after:
+            return False
+        last = last_run_date()
+        return last is None or last < last_ended_day()
+
+    def run_once(self):
+        from models import db
+        with self.app.app_context():
+            try:
+                if self.is_due():
+                    summary = run_nightly(owner=self.owner)
+                    if summary:
+                        self.app.logger.info('Nightly job finished: %s', summary)
+            except Exception as e:
+                self.app.logger.error('Nightly job error: %s', e)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.check_seconds)
+
+
+def init_scheduler(app):
+    if not app.config.get('NIGHTLY_JOBS_ENABLED'):
+        return None
+    hour, minute = (int(part) for part in app.config.get('NIGHTLY_RUN_AFTER', '00:05').split(':'))
+    scheduler = NightlyScheduler(app, app.config.get('NIGHTLY_CHECK_SECONDS', 300), datetime.time(hour, minute))
+    app.extensions['habit_scheduler'] = scheduler
+    scheduler.start()
+    return scheduler
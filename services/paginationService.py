@@ -0,0 +1,52 @@
+from flask import Response, current_app, request, stream_with_context
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+
+def encode_cursor(values):
+    # Opaque keyset cursor: the sort key of the last row of the page
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token):
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+def wants_pagination():
+    return 'limit' in request.args or 'cursor' in request.args
+
+def wants_stream():
+    return request.args.get('format') == 'ndjson'
+
+def page_args():
+    # Returns (limit, cursor values or None); raises ValueError on bad input
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+    token = request.args.get('cursor')
+    return limit, decode_cursor(token) if token else None
+
+def fetch_page(query, limit, cursor_of):
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(cursor_of(rows[limit - 1])) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def ndjson_response(query, serialize, batch_size=STREAM_BATCH_SIZE):
+    # Streams one JSON document per row, encoded with the app's JSON provider;
+    # yield_per keeps only one batch of rows alive at a time
+    def generate():
+        dumps = current_app.json.dumps
+        for row in query.yield_per(batch_size):
+            yield dumps(serialize(row)) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
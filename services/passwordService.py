@@ -0,0 +1,84 @@
+from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import check_password_hash, generate_password_hash
+import atexit
+import threading
+
+# Password hashing is CPU-bound on purpose, so at most PASSWORD_HASH_WORKERS hashes
+# run at once in a small worker pool. hashlib's pbkdf2/scrypt release the GIL, so
+# the workers hash in parallel while request threads keep serving other routes.
+# A semaphore caps in-flight plus queued hashes; when it is exhausted callers get
+# HashingBusy (mapped to a 503) instead of piling up behind a login storm.
+
+class HashingBusy(Exception):
+    pass
+
+class HashingPool:
+    def __init__(self, method, workers=2, queue_size=8, queue_timeout=0.1):
+        self.method = method
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_size)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._method_prefix = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix='password-hash'
+                    )
+                    atexit.register(self._executor.shutdown, wait=False)
+        return self._executor
+
+    def run(self, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashingBusy('Password hashing pool is saturated')
+        try:
+            if self.workers <= 0:
+                return func(*args)
+            return self._get_executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self.run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self.run(check_password_hash, password_hash, password)
+
+    def method_prefix(self):
+        # Canonical "algorithm:params" string of the configured method, e.g.
+        # 'pbkdf2' expands to 'pbkdf2:sha256:600000'
+        if self._method_prefix is None:
+            self._method_prefix = self.run(generate_password_hash, '', self.method).split('$', 1)[0]
+        return self._method_prefix
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.method_prefix()
+
+
+def init_password_pool(app):
+    pool = HashingPool(
+        app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000'),
+        app.config.get('PASSWORD_HASH_WORKERS', 2),
+        app.config.get('PASSWORD_HASH_QUEUE', 8),
+        app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 0.1)
+    )
+    app.extensions['habit_password_pool'] = pool
+    return pool
+
+def password_pool():
+    return current_app.extensions['habit_password_pool']
+
+def hash_password(password):
+    return password_pool().hash(password)
+
+def verify_password(password_hash, password):
+    return password_pool().verify(password_hash, password)
+
+def password_needs_rehash(password_hash):
+    return password_pool().needs_rehash(password_hash)
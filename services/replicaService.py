@@ -0,0 +1,129 @@
+from flask import current_app, g, has_app_context, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+import functools
+import sqlite3
+import threading
+import time
+
+# Read-replica routing. When READ_REPLICA_URL is set the app gets its own replica
+# engine and pool, kept in app.extensions. Views wrapped in read_replica send
+# their SELECTs there, as long as the replica is fresher than the endpoint's
+# staleness tolerance and the user hasn't written since it was last synced.
+# Flushes and INSERT/UPDATE/DELETE statements always go to the primary.
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and getattr(clause, 'is_select', False)
+            and has_request_context()
+            and g.get('use_replica', False)
+        ):
+            return current_app.extensions['habit_replica'].engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaMonitor:
+    # The replica engine of one app, and its last sync time cached from the
+    # replica's replica_state table
+    def __init__(self, engine, check_seconds=1.0):
+        self.engine = engine
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._checked_at = 0.0
+        self._warned = False
+
+    def synced_at(self):
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_seconds:
+                return self._synced_at
+        try:
+            with self.engine.connect() as conn:
+                synced_at = conn.exec_driver_sql('SELECT synced_at FROM replica_state WHERE id = 1').scalar()
+        except Exception as e:
+            # No sync marker yet (or replica unreachable): treat as infinitely stale
+            if not self._warned:
+                current_app.logger.warning('Read replica unavailable, reading from the primary: %s', e)
+                self._warned = True
+            synced_at = None
+        else:
+            self._warned = False
+        with self._lock:
+            self._synced_at = synced_at
+            self._checked_at = time.monotonic()
+        return synced_at
+
+
+def init_replica(app):
+    # The engine belongs to the app rather than to the shared db, so apps created
+    # without a replica never see it
+    url = app.config.get('READ_REPLICA_URL')
+    if url:
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        app.extensions['habit_replica'] = ReplicaMonitor(create_engine(url, **options))
+
+def replica_enabled():
+    return has_app_context() and 'habit_replica' in current_app.extensions
+
+def staleness_tolerance(endpoint):
+    tolerances = current_app.config.get('REPLICA_STALENESS') or {}
+    return tolerances.get(endpoint, current_app.config.get('REPLICA_DEFAULT_STALENESS', 30))
+
+def should_use_replica(endpoint, user_id):
+    if not replica_enabled():
+        return False
+    synced_at = current_app.extensions['habit_replica'].synced_at()
+    if synced_at is None or time.time() - synced_at > staleness_tolerance(endpoint):
+        return False
+
+    # Read-your-writes: every write bumps the user's data version on the primary
+    # in the same transaction, so a version newer than the last sync means the
+    # replica hasn't seen it yet, whichever worker handled the write
+    from services.cacheService import data_version
+    if user_id and data_version(user_id) >= synced_at:
+        return False
+    return True
+
+def read_replica(endpoint):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from services.tokenService import current_user_id
+            g.use_replica = should_use_replica(endpoint, current_user_id())
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def use_primary():
+    # Sends the rest of the request's reads to the primary, e.g. after the view
+    # wrote rows there that the replica can't have yet
+    if has_request_context():
+        g.use_replica = False
+
+def sqlite_path(engine):
+    if engine.dialect.name != 'sqlite' or not engine.url.database or engine.url.database == ':memory:':
+        raise ValueError(f'Replica sync needs file-backed SQLite databases, got {engine.url}')
+    return engine.url.database
+
+def sync_replica():
+    # Copies the primary into the replica with SQLite's online backup API and
+    # stamps the copy with its sync time. Must be called inside an app context.
+    from models import db
+
+    if not replica_enabled():
+        raise ValueError('READ_REPLICA_URL is not configured')
+    source = sqlite3.connect(sqlite_path(db.engine))
+    target = sqlite3.connect(sqlite_path(current_app.extensions['habit_replica'].engine), timeout=30)
+    try:
+        synced_at = time.time()
+        source.backup(target)
+        target.execute('CREATE TABLE IF NOT EXISTS replica_state (id INTEGER PRIMARY KEY CHECK (id = 1), synced_at REAL NOT NULL)')
+        target.execute('INSERT OR REPLACE INTO replica_state (id, synced_at) VALUES (1, ?)', (synced_at,))
+        target.commit()
+    finally:
+        source.close()
+        target.close()
+    return synced_at
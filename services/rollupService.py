@@ -0,0 +1,182 @@
+import datetime
+from services.scheduleService import day_start, habit_end, habit_start, scheduled_counts
+
+# daily_user_stats holds one row per user per day from the user's earliest habit
+# start date up to the last day anyone asked about (normally today). Rows are
+# materialized lazily by ensure_rollup and then adjusted incrementally by the
+# write paths in habitController.
+
+def _weekday_filter(habit):
+    # SQLite's %w counts from Sunday = 0, Python's weekday() from Monday = 0
+    from models import db, DailyUserStats
+    return db.func.strftime('%w', DailyUserStats.date) == str((habit.start_date.weekday() + 1) % 7)
+
+def count_checkins_by_day(habit_ids, start, end):
+    # {(date, status): count} for check-ins of the given habits between start and end
+    from models import db, HabitCheckin
+    if not habit_ids:
+        return {}
+    checkin_day = db.func.date(HabitCheckin.checkin_date)
+    rows = db.session.query(checkin_day, HabitCheckin.status, db.func.count(HabitCheckin.id)).filter(
+        HabitCheckin.habit_id.in_(habit_ids),
+        HabitCheckin.checkin_date >= day_start(start),
+        HabitCheckin.checkin_date < day_start(end + datetime.timedelta(days=1))
+    ).group_by(checkin_day, HabitCheckin.status).all()
+    return {(datetime.date.fromisoformat(day), status): count for day, status, count in rows}
+
+def materialize(user_id, habits, start, end):
+    from models import db, DailyUserStats
+    if end < start:
+        return 0
+    scheduled = scheduled_counts(habits, start, end)
+    checkins = count_checkins_by_day([habit.id for habit in habits], start, end)
+
+    completed = {}
+    skipped = {}
+    for (day, status), count in checkins.items():
+        target = completed if status == 'completed' else skipped
+        target[day] = target.get(day, 0) + count
+
+    rows = []
+    for offset, scheduled_count in enumerate(scheduled):
+        day = start + datetime.timedelta(days=offset)
+        rows.append({
+            'user_id': user_id,
+            'date': day,
+            'scheduled': scheduled_count,
+            'completed': completed.get(day, 0),
+            'skipped': skipped.get(day, 0)
+        })
+    # Another request may have materialized the same days concurrently
+    db.session.execute(db.insert(DailyUserStats).prefix_with('OR IGNORE'), rows)
+    return len(rows)
+
+def ensure_rollup(user_id, through=None, habits=None):
+    # Make sure rows exist for every day from the earliest habit start through the given day
+    from models import db, Habit, DailyUserStats
+    through = through or datetime.datetime.now().date()
+    if habits is None:
+        # Habits are only loaded when rows actually have to be materialized
+        first_start = db.session.query(db.func.min(Habit.start_date)).filter(Habit.user_id == user_id).scalar()
+        if first_start is None:
+            return 0
+        first_day = first_start.date()
+    elif not habits:
+        return 0
+    else:
+        first_day = min(habit_start(habit) for habit in habits)
+    if first_day > through:
+        return 0
+
+    low, high = db.session.query(
+        db.func.min(DailyUserStats.date), db.func.max(DailyUserStats.date)
+    ).filter(DailyUserStats.user_id == user_id).one()
+
+    missing = []
+    if low is None:
+        missing.append((first_day, through))
+    else:
+        if first_day < low:
+            missing.append((first_day, low - datetime.timedelta(days=1)))
+        if high < through:
+            missing.append((high + datetime.timedelta(days=1), through))
+    if not missing:
+        return 0
+
+    if habits is None:
+        habits = Habit.query.filter_by(user_id=user_id).all()
+    rows = sum(materialize(user_id, habits, start, end) for start, end in missing)
+    if rows:
+        # The rows went to the primary; a replica read later in the request would miss them
+        from services.replicaService import use_primary
+        use_primary()
+    return rows
+
+def apply_habit_schedule(habit, delta):
+    # Add (or remove, with delta=-1) a habit's schedule on the already materialized rows
+    from models import db, DailyUserStats
+    conditions = [
+        DailyUserStats.user_id == habit.user_id,
+        DailyUserStats.date >= habit_start(habit)
+    ]
+    end = habit_end(habit)
+    if end is not None:
+        conditions.append(DailyUserStats.date <= end)
+    if habit.frequency == 'weekly':
+        conditions.append(_weekday_filter(habit))
+    db.session.execute(
+        db.update(DailyUserStats).where(*conditions).values(scheduled=DailyUserStats.scheduled + delta)
+    )
+
+def record_checkin(user_id, day, status, delta=1):
+    from models import db, DailyUserStats
+    column = 'completed' if status == 'completed' else 'skipped'
+    db.session.execute(
+        db.update(DailyUserStats).where(
+            DailyUserStats.user_id == user_id,
+            DailyUserStats.date == day
+        ).values({column: getattr(DailyUserStats, column) + delta})
+    )
+
+def record_checkins(user_id, deltas):
+    # Applies {(day, status): delta} to the user's rows in one executemany UPDATE
+    from models import db, DailyUserStats
+    by_day = {}
+    for (day, status), delta in deltas.items():
+        counts = by_day.setdefault(day, {'completed': 0, 'skipped': 0})
+        counts['completed' if status == 'completed' else 'skipped'] += delta
+    if not by_day:
+        return
+
+    stats = DailyUserStats.__table__
+    db.session.execute(
+        db.update(stats).where(
+            stats.c.user_id == user_id,
+            stats.c.date == db.bindparam('target_date')
+        ).values(
+            completed=stats.c.completed + db.bindparam('completed_delta'),
+            skipped=stats.c.skipped + db.bindparam('skipped_delta')
+        ),
+        [
+            {'target_date': day, 'completed_delta': counts['completed'], 'skipped_delta': counts['skipped']}
+            for day, counts in by_day.items()
+        ]
+    )
+
+def remove_habit(habit):
+    # Take a habit's schedule and check-ins back out of the rollup before it is deleted
+    from models import db, HabitCheckin, DailyUserStats
+    apply_habit_schedule(habit, -1)
+
+    checkin_day = db.func.date(HabitCheckin.checkin_date)
+    rows = db.session.query(checkin_day, HabitCheckin.status, db.func.count(HabitCheckin.id)).filter(
+        HabitCheckin.habit_id == habit.id
+    ).group_by(checkin_day, HabitCheckin.status).all()
+
+    record_checkins(habit.user_id, {
+        (datetime.date.fromisoformat(day), status): -count for day, status, count in rows
+    })
+
+def read_rollup(user_id, start, end):
+    from models import DailyUserStats
+    rows = DailyUserStats.query.filter(
+        DailyUserStats.user_id == user_id,
+        DailyUserStats.date >= start,
+        DailyUserStats.date <= end
+    ).all()
+    return {row.date: row for row in rows}
+
+def rebuild_rollups(user_ids=None):
+    # Backfill/repair: recompute every row for the given users (or everyone) from history
+    from models import db, Habit, User, DailyUserStats
+    from services.timezoneService import default_timezone, local_today
+    if user_ids is None:
+        user_ids = [user_id for user_id, in db.session.query(Habit.user_id).distinct().all()]
+
+    timezones = dict(db.session.query(User.id, User.timezone).filter(User.id.in_(user_ids)).all()) if user_ids else {}
+    rows = 0
+    for user_id in user_ids:
+        DailyUserStats.query.filter_by(user_id=user_id).delete()
+        rows += ensure_rollup(user_id, local_today(timezones.get(user_id) or default_timezone()))
+        db.session.commit()
+    return rows
@@ -0,0 +1,103 @@
+import datetime
+import functools
+
+# When a habit is due: daily habits every day, weekly habits on the weekday of
+# their start date, from start_date through start_date + target_duration - 1.
+# Due-sets over a date range are Python ints used as bitmasks (bit i = start + i
+# days), so "which days is this habit due" and "which habits are due on day D"
+# are a few big-int operations instead of per-day loops.
+
+def day_start(day):
+    # Midnight starting the day, as start_date and checkin_date are stored
+    return datetime.datetime.combine(day, datetime.datetime.min.time())
+
+def habit_start(habit):
+    return habit.start_date.date() if isinstance(habit.start_date, datetime.datetime) else habit.start_date
+
+def habit_end(habit):
+    # Last day the habit is scheduled, or None when it runs indefinitely
+    if not habit.target_duration or habit.target_duration <= 0:
+        return None
+    return habit_start(habit) + datetime.timedelta(days=habit.target_duration - 1)
+
+def is_scheduled_on(habit, day):
+    start = habit_start(habit)
+    end = habit_end(habit)
+    if day < start or (end is not None and day > end):
+        return False
+    if habit.frequency == 'daily':
+        return True
+    if habit.frequency == 'weekly':
+        return start.weekday() == day.weekday()
+    return False
+
+@functools.lru_cache(maxsize=64)
+def every_seventh_bit(days):
+    # Bits 0, 7, 14, ... below `days`
+    return int(('0000001' * (days // 7 + 1))[-days:], 2) if days > 0 else 0
+
+def due_mask(habit, start, days):
+    # Bitmask of the days in [start, start + days) on which the habit is due
+    first = max((habit_start(habit) - start).days, 0)
+    end = habit_end(habit)
+    last = days - 1 if end is None else min((end - start).days, days - 1)
+    if first > last or habit.frequency not in ('daily', 'weekly'):
+        return 0
+    window = ((1 << (last - first + 1)) - 1) << first
+    if habit.frequency == 'daily':
+        return window
+    first += (habit_start(habit).weekday() - (start + datetime.timedelta(days=first)).weekday()) % 7
+    return (every_seventh_bit(days) << first) & window
+
+def due_masks(habits, start, end):
+    # {habit id: due bitmask} over start..end (inclusive)
+    days = (end - start).days + 1
+    return {habit.id: due_mask(habit, start, days) for habit in habits}
+
+def due_on(habits, day):
+    # Habits due on the given day; a one-day window needs no bitmask
+    return [habit for habit in habits if is_scheduled_on(habit, day)]
+
+def due_days(mask, start):
+    # Dates whose bit is set in a due bitmask
+    days = []
+    while mask:
+        low = mask & -mask
+        days.append(start + datetime.timedelta(days=low.bit_length() - 1))
+        mask ^= low
+    return days
+
+def scheduled_counts(habits, start, end):
+    # Number of habits scheduled on each day from start to end (inclusive), in
+    # O(habits + days): daily habits add a step at their first day and remove it
+    # after their last, weekly habits add a step that is carried forward every 7
+    # days and cancelled one week after their last occurrence
+    days = (end - start).days + 1
+    if days <= 0:
+        return []
+
+    daily_steps = [0] * (days + 1)
+    weekly_steps = [0] * (days + 7)
+    for habit in habits:
+        first = max((habit_start(habit) - start).days, 0)
+        habit_last = habit_end(habit)
+        last = days - 1 if habit_last is None else min((habit_last - start).days, days - 1)
+        if first > last:
+            continue
+        if habit.frequency == 'daily':
+            daily_steps[first] += 1
+            daily_steps[last + 1] -= 1
+        elif habit.frequency == 'weekly':
+            first += (habit_start(habit).weekday() - (start + datetime.timedelta(days=first)).weekday()) % 7
+            if first <= last:
+                weekly_steps[first] += 1
+                weekly_steps[first + (last - first) // 7 * 7 + 7] -= 1
+
+    counts = []
+    running_daily = 0
+    for offset in range(days):
+        running_daily += daily_steps[offset]
+        if offset >= 7:
+            weekly_steps[offset] += weekly_steps[offset - 7]
+        counts.append(running_daily + weekly_steps[offset])
+    return counts
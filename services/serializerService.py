@@ -0,0 +1,37 @@
+import functools
+from sqlalchemy import Date, DateTime
+
+# Column projections for list endpoints. Instead of loading ORM instances and
+# calling to_dict on each, the query selects just the serialized columns as
+# tuples (no identity map, no attribute instrumentation) and each row is zipped
+# straight into a dict. Keys are the column names, so the output matches the
+# models' to_dict.
+
+class Projection:
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        self.keys = tuple(column.key for column in self.columns)
+        # Dates and datetimes are the only values that need converting
+        self.temporal_keys = tuple(
+            column.key for column in self.columns if isinstance(column.type, (Date, DateTime))
+        )
+
+    def select(self, query):
+        return query.with_entities(*self.columns)
+
+    def serialize(self, row):
+        item = dict(zip(self.keys, row))
+        for key in self.temporal_keys:
+            value = item[key]
+            if value is not None:
+                item[key] = value.isoformat()
+        return item
+
+    def serialize_all(self, rows):
+        return [self.serialize(row) for row in rows]
+
+
+@functools.lru_cache(maxsize=None)
+def projection_for(model):
+    # One projection per model, built from its serialized_columns()
+    return Projection(model.serialized_columns())
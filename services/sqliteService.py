@@ -0,0 +1,78 @@
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+import functools
+import sqlite3
+import time
+
+# Production profile for the SQLite engine. WAL lets readers run alongside the
+# single writer, and busy_timeout makes writers queue for the write lock inside
+# SQLite instead of failing at once. Write endpoints wrapped in retry_on_busy get
+# another attempt if the lock still isn't free when busy_timeout runs out.
+
+PRAGMA_SETTINGS = (
+    ('journal_mode', 'SQLITE_JOURNAL_MODE'),
+    ('synchronous', 'SQLITE_SYNCHRONOUS'),
+    ('cache_size', 'SQLITE_CACHE_SIZE'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE'),
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS'),
+)
+
+def is_file_database(uri):
+    return uri.startswith('sqlite') and ':memory:' not in uri and uri.rstrip('/') not in ('sqlite:', 'sqlite:/')
+
+def configure_engine_options(app):
+    # Must run before db.init_app; explicit SQLALCHEMY_ENGINE_OPTIONS win
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    if not app.config.get('SQLITE_TUNING_ENABLED', True) or not is_file_database(uri):
+        return
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.setdefault('pool_size', app.config.get('DB_POOL_SIZE', 10))
+    options.setdefault('max_overflow', app.config.get('DB_MAX_OVERFLOW', 10))
+    options.setdefault('pool_timeout', app.config.get('DB_POOL_TIMEOUT', 30))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def init_sqlite(app):
+    from models import db
+
+    if not app.config.get('SQLITE_TUNING_ENABLED', True):
+        return
+    pragmas = [(name, app.config.get(key)) for name, key in PRAGMA_SETTINGS]
+    pragmas = [(name, value) for name, value in pragmas if value not in (None, '')]
+
+    def on_connect(dbapi_connection, connection_record):
+        for name, value in pragmas:
+            dbapi_connection.execute(f'PRAGMA {name}={value}')
+
+    def on_error(context):
+        # Flag the request so retry_on_busy can re-run it once the view has rolled back
+        if is_busy_error(context.original_exception) and has_request_context():
+            g.database_busy = True
+
+    with app.app_context():
+        engines = list(db.engines.values())
+        if 'habit_replica' in app.extensions:
+            engines.append(app.extensions['habit_replica'].engine)
+        for engine in engines:
+            if engine.dialect.name != 'sqlite':
+                continue
+            event.listen(engine, 'connect', on_connect)
+            event.listen(engine, 'handle_error', on_error)
+
+def is_busy_error(error):
+    return isinstance(error, sqlite3.OperationalError) and 'database is locked' in str(error)
+
+def retry_on_busy(view):
+    # Re-runs a write view whose transaction failed with SQLITE_BUSY after
+    # busy_timeout ran out. Views roll back their session before returning the
+    # error response, so the retry starts from a clean transaction.
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        retries = current_app.config.get('SQLITE_WRITE_RETRIES', 3)
+        for attempt in range(retries + 1):
+            g.database_busy = False
+            response = view(*args, **kwargs)
+            if not g.database_busy or attempt == retries:
+                return response
+            current_app.logger.warning('Database busy in %s, retrying (%d/%d)', request.endpoint, attempt + 1, retries)
+            time.sleep(0.05 * 2 ** attempt)
+    return wrapper
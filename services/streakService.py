@@ -0,0 +1,58 @@
+def compute_streak_counters(dates):
+    # dates: ascending, distinct completion dates for one habit
+    current = 0
+    longest = 0
+    previous = None
+    for day in dates:
+        if previous is not None and (day - previous).days == 1:
+            current += 1
+        else:
+            current = 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest, previous
+
+def rebuild_streaks(habit_ids=None, batch_size=500, commit=True):
+    # Recompute current/longest streak and last completion from check-in history.
+    # Streams completed check-ins ordered by habit so memory stays per-habit.
+    from models import db, Habit, HabitCheckin
+
+    habits_query = Habit.query
+    if habit_ids is not None:
+        if not habit_ids:
+            return 0
+        habits_query = habits_query.filter(Habit.id.in_(habit_ids))
+    habits = {habit.id: habit for habit in habits_query.all()}
+
+    counters = {}
+    checkins = db.session.query(HabitCheckin.habit_id, HabitCheckin.checkin_date).filter(
+        HabitCheckin.status == 'completed'
+    )
+    if habit_ids is not None:
+        checkins = checkins.filter(HabitCheckin.habit_id.in_(habit_ids))
+    checkins = checkins.order_by(HabitCheckin.habit_id, HabitCheckin.checkin_date).yield_per(batch_size)
+
+    current_habit = None
+    dates = []
+    for habit_id, checkin_date in checkins:
+        if habit_id != current_habit:
+            if current_habit is not None:
+                counters[current_habit] = compute_streak_counters(dates)
+            current_habit = habit_id
+            dates = []
+        day = checkin_date.date()
+        if not dates or dates[-1] != day:
+            dates.append(day)
+    if current_habit is not None:
+        counters[current_habit] = compute_streak_counters(dates)
+
+    for habit_id, habit in habits.items():
+        current, longest, last = counters.get(habit_id, (0, 0, None))
+        habit.current_streak = current
+        habit.longest_streak = longest
+        habit.last_completed_date = last
+        habit.keep_updated_at()
+
+    if commit:
+        db.session.commit()
+    return len(habits)
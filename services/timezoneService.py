@@ -0,0 +1,80 @@
+from flask import current_app, g, has_request_context, session
+import datetime
+import functools
+import zoneinfo
+from services.scheduleService import day_start
+
+# Per-user "today". Check-ins are stored as the user's local calendar day
+# (midnight, naive), so the only timezone-dependent question is which day it is
+# right now. That is answered once per request from the user's current UTC
+# offset, and every date predicate keeps comparing plain day boundaries against
+# the indexed columns, with no per-row conversion. A user without a timezone
+# gets DEFAULT_TIMEZONE, or the server's local time when that is empty.
+
+@functools.lru_cache(maxsize=256)
+def get_zone(name):
+    return zoneinfo.ZoneInfo(name)
+
+def valid_timezone(name):
+    if not isinstance(name, str) or not name:
+        return False
+    try:
+        get_zone(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+def default_timezone():
+    return current_app.config.get('DEFAULT_TIMEZONE') or None
+
+def utc_offset(name, at):
+    # Offset of the zone (or of the server's local time) at the aware instant `at`
+    return at.astimezone(get_zone(name) if name else None).utcoffset()
+
+def local_now(name=None):
+    # Naive local time in the zone
+    utc_now = datetime.datetime.now(datetime.timezone.utc)
+    return (utc_now + utc_offset(name, utc_now)).replace(tzinfo=None)
+
+def local_today(name=None):
+    return local_now(name).date()
+
+def day_start_timestamp(name=None):
+    # UNIX timestamp of the start of the current local day in the zone
+    utc_now = datetime.datetime.now(datetime.timezone.utc)
+    offset = utc_offset(name, utc_now)
+    midnight = day_start((utc_now + offset).date())
+    return (midnight - offset).replace(tzinfo=datetime.timezone.utc).timestamp()
+
+def current_timezone():
+    # The signed-in user's timezone, looked up once per request: from the access
+    # token's tz claim, then the session, then the users table
+    if not has_request_context():
+        return default_timezone()
+    if 'user_timezone' not in g:
+        g.user_timezone = _lookup_timezone() or default_timezone()
+    return g.user_timezone
+
+def _lookup_timezone():
+    from services.tokenService import current_token_claims, current_user_id, sessions_enabled
+    claims = current_token_claims()
+    if claims and 'tz' in claims:
+        return claims['tz']
+    if sessions_enabled() and 'timezone' in session:
+        return session['timezone']
+    user_id = current_user_id()
+    if not user_id:
+        return None
+
+    from models import db, User
+    name = db.session.query(User.timezone).filter(User.id == user_id).scalar()
+    if sessions_enabled() and session.get('user_id') == user_id:
+        # Sessions created before timezones existed only need the lookup once
+        session['timezone'] = name
+    return name
+
+def user_now():
+    return local_now(current_timezone())
+
+def user_today():
+    return local_today(current_timezone())
@@ -0,0 +1,145 @@
+from flask import current_app, g, request, session
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+import datetime
+import threading
+import time
+import uuid
+
+# Signed, expiring access/refresh tokens. Access tokens carry the user's public
+# fields as claims so they can be verified and used without a database hit; the
+# only shared state is the revocation list, which each worker syncs from the
+# revoked_tokens table every REVOCATION_SYNC_SECONDS.
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+class TokenError(Exception):
+    pass
+
+def auth_mode():
+    return current_app.config.get('AUTH_MODE', 'session')
+
+def sessions_enabled():
+    return auth_mode() in ('session', 'both')
+
+def tokens_enabled():
+    return auth_mode() in ('token', 'both')
+
+def _serializer(kind):
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=f'habithero-{kind}-token')
+
+def _ttl(kind):
+    if kind == ACCESS:
+        return current_app.config.get('ACCESS_TOKEN_TTL', 900)
+    return current_app.config.get('REFRESH_TOKEN_TTL', 30 * 24 * 3600)
+
+
+class RevocationList:
+    # In-memory set of revoked token ids, refreshed from the database periodically
+    def __init__(self, sync_seconds):
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()
+        self._revoked = {}
+        self._synced_at = 0.0
+        self._high_water = None
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti):
+        if time.monotonic() - self._synced_at >= self.sync_seconds:
+            self.sync()
+        with self._lock:
+            return jti in self._revoked
+
+    def sync(self):
+        from models import RevokedToken
+        now = datetime.datetime.utcnow()
+        query = RevokedToken.query.filter(RevokedToken.expires_at > now)
+        if self._high_water is not None:
+            # Overlap the previous sync to tolerate clock skew between workers
+            query = query.filter(RevokedToken.revoked_at >= self._high_water - datetime.timedelta(seconds=60))
+        rows = query.all()
+
+        with self._lock:
+            for row in rows:
+                self._revoked[row.jti] = row.expires_at
+                if self._high_water is None or row.revoked_at > self._high_water:
+                    self._high_water = row.revoked_at
+            if self._high_water is None:
+                self._high_water = now
+            self._revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+            self._synced_at = time.monotonic()
+
+
+def init_tokens(app):
+    app.extensions['habit_revocations'] = RevocationList(app.config.get('REVOCATION_SYNC_SECONDS', 30))
+
+def revocations():
+    return current_app.extensions['habit_revocations']
+
+def issue_token(kind, user):
+    claims = {'sub': user.id, 'typ': kind, 'jti': str(uuid.uuid4())}
+    if kind == ACCESS:
+        claims['user'] = user.to_dict()
+        # Lets views work out the user's "today" without a lookup
+        claims['tz'] = user.timezone
+    return _serializer(kind).dumps(claims)
+
+def issue_token_pair(user):
+    return {
+        'access_token': issue_token(ACCESS, user),
+        'refresh_token': issue_token(REFRESH, user),
+        'token_type': 'Bearer',
+        'expires_in': _ttl(ACCESS)
+    }
+
+def verify_token(token, kind):
+    # Returns the claims of a valid, unexpired and unrevoked token or raises TokenError
+    try:
+        claims, issued_at = _serializer(kind).loads(token, max_age=_ttl(kind), return_timestamp=True)
+    except SignatureExpired:
+        raise TokenError('Token expired')
+    except BadSignature:
+        raise TokenError('Invalid token')
+    if not isinstance(claims, dict) or claims.get('typ') != kind:
+        raise TokenError('Invalid token')
+    if revocations().is_revoked(claims['jti']):
+        raise TokenError('Token revoked')
+    claims['exp'] = issued_at.replace(tzinfo=None) + datetime.timedelta(seconds=_ttl(kind))
+    return claims
+
+def revoke(claims):
+    from models import db, RevokedToken
+    RevokedToken.query.filter(RevokedToken.expires_at <= datetime.datetime.utcnow()).delete()
+    db.session.merge(RevokedToken(jti=claims['jti'], expires_at=claims['exp']))
+    db.session.commit()
+    revocations().add(claims['jti'], claims['exp'])
+
+def bearer_token():
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip()
+    return None
+
+def current_token_claims():
+    # Claims of the request's bearer access token, verified once per request
+    if 'token_claims' not in g:
+        claims = None
+        token = bearer_token() if tokens_enabled() else None
+        if token:
+            try:
+                claims = verify_token(token, ACCESS)
+            except TokenError:
+                claims = None
+        g.token_claims = claims
+    return g.token_claims
+
+def current_user_id():
+    claims = current_token_claims()
+    if claims:
+        return claims['sub']
+    if sessions_enabled():
+        return session.get('user_id')
+    return None
@@ -0,0 +1,289 @@
+import csv
+import datetime
+import io
+import json
+from services.scheduleService import day_start
+
+# Habit import/export as a flat record stream, in CSV or NDJSON. Habit records
+# carry a `ref` that their check-in records point back to, and a habit must come
+# before its check-ins in the stream. Exports write each habit's id as its ref,
+# so an export can be imported again as is:
+#
+#   {"type": "habit", "ref": "7", "name": "Run", "frequency": "daily", "category": "Fitness",
+#    "start_date": "2024-01-01", "target_duration": 365, "note": ""}
+#   {"type": "checkin", "ref": "7", "date": "2024-01-02", "status": "completed", "notes": ""}
+#
+# Imports parse incrementally and are validated and inserted one batch at a time,
+# each batch in its own transaction, so memory stays flat for years of history.
+
+FORMATS = ('csv', 'ndjson')
+FIELDS = ('type', 'ref', 'name', 'frequency', 'category', 'start_date', 'target_duration', 'note',
+          'date', 'status', 'notes')
+MAX_REPORTED_ERRORS = 100
+
+def _parse_day(value, field):
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be a date (YYYY-MM-DD)')
+
+def read_records(stream, fmt):
+    # Yields (line number, record) from a binary stream without reading it whole
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_number, record
+
+def _text(record, field):
+    value = record.get(field) or ''
+    if not isinstance(value, str):
+        raise ValueError(f'{field} must be a string')
+    return value.strip()
+
+def validate_habit(record):
+    # Returns the column values of a habit record or raises ValueError with the reason
+    from models.habitModel import HABIT_CATEGORIES, HABIT_FREQUENCIES
+    name = _text(record, 'name')
+    if not name or len(name) > 100:
+        raise ValueError('name must be 1-100 characters')
+    if record.get('frequency') not in HABIT_FREQUENCIES:
+        raise ValueError('Frequency must be daily or weekly')
+    if record.get('category') not in HABIT_CATEGORIES:
+        raise ValueError('Invalid category')
+    target_duration = record.get('target_duration')
+    if isinstance(target_duration, bool) or not isinstance(target_duration, (int, str)):
+        raise ValueError('target_duration must be an integer')
+    try:
+        target_duration = int(target_duration)
+    except ValueError:
+        raise ValueError('target_duration must be an integer')
+    if target_duration < 1:
+        raise ValueError('target_duration must be positive')
+    return {
+        'name': name,
+        'frequency': record['frequency'],
+        'category': record['category'],
+        'start_date': day_start(_parse_day(record.get('start_date'), 'start_date')),
+        'target_duration': target_duration,
+        'note': _text(record, 'note')
+    }
+
+def validate_checkin(record, habit, today):
+    # habit: (id, start day) of the referenced habit
+    from models.habitModel import CHECKIN_STATUSES
+    day = _parse_day(record.get('date'), 'date')
+    if day > today:
+        raise ValueError('Cannot check in on a future date')
+    if day < habit[1]:
+        raise ValueError('Date is before the habit start date')
+    status = record.get('status') or 'completed'
+    if status not in CHECKIN_STATUSES:
+        raise ValueError(f'status must be one of {", ".join(CHECKIN_STATUSES)}')
+    return {'habit_id': habit[0], 'checkin_date': day_start(day), 'status': status, 'notes': _text(record, 'notes')}
+
+class HabitImport:
+    # Validates and inserts records for one user a batch at a time, then rebuilds
+    # the derived data of everything that was committed
+    def __init__(self, user_id, today, batch_size=1000):
+        self.user_id = user_id
+        self.today = today
+        self.batch_size = batch_size
+        self.refs = {}
+        self.habits = 0
+        self.checkins = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors = []
+        self.line = 0
+        self.aborted = None
+
+    def fail(self, line_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def run(self, records):
+        # A failure part-way (a database error, a broken upload) rolls back the
+        # current batch only and is re-raised for the caller to report. The
+        # batches committed before it stay imported, so their streaks and rollups
+        # are rebuilt either way and summary() says where the import stopped.
+        from models import db
+        batch = []
+        try:
+            for line_number, record in records:
+                self.line = line_number
+                batch.append((line_number, record))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+            if batch:
+                self.import_batch(batch)
+        except Exception as e:
+            db.session.rollback()
+            first_unsaved = batch[0][0] if batch else self.line + 1
+            reason = 'invalid file encoding' if isinstance(e, UnicodeDecodeError) else 'the batch could not be saved'
+            self.aborted = f'Import stopped ({reason}); records from line {first_unsaved} on were not imported'
+            raise
+        finally:
+            self.finish()
+        return self.summary()
+
+    def import_batch(self, batch):
+        from models import db, Habit, HabitCheckin
+        from services.cacheService import invalidate_user
+
+        # Refs and counts only become part of the import once the batch commits
+        refs = {}
+        habits = checkins = duplicates = 0
+
+        # Habits first so check-ins later in the same batch can resolve their refs
+        habit_rows, habit_refs = [], []
+        for line_number, record in batch:
+            if not isinstance(record, dict) or record.get('type') not in ('habit', 'checkin'):
+                self.fail(line_number, 'Record must be an object with type habit or checkin')
+            elif record['type'] == 'habit':
+                ref = str(record.get('ref') or '')
+                try:
+                    if not ref:
+                        raise ValueError('ref is required')
+                    if ref in self.refs or ref in habit_refs:
+                        raise ValueError(f'Duplicate habit ref {ref}')
+                    values = validate_habit(record)
+                except ValueError as e:
+                    self.fail(line_number, str(e))
+                    continue
+                values['user_id'] = self.user_id
+                habit_rows.append(values)
+                habit_refs.append(ref)
+
+        if habit_rows:
+            habit_ids = db.session.execute(
+                db.insert(Habit).returning(Habit.id, sort_by_parameter_order=True), habit_rows
+            ).scalars().all()
+            for ref, habit_id, values in zip(habit_refs, habit_ids, habit_rows):
+                refs[ref] = (habit_id, values['start_date'].date())
+            habits = len(habit_ids)
+
+        checkin_rows = []
+        for line_number, record in batch:
+            if not isinstance(record, dict) or record.get('type') != 'checkin':
+                continue
+            ref = str(record.get('ref') or '')
+            habit = refs.get(ref) or self.refs.get(ref)
+            if habit is None:
+                self.fail(line_number, 'Unknown habit ref')
+                continue
+            try:
+                checkin_rows.append(validate_checkin(record, habit, self.today))
+            except ValueError as e:
+                self.fail(line_number, str(e))
+
+        if checkin_rows:
+            # One check-in per habit per day: repeats are counted, not errors
+            inserted = db.session.execute(
+                db.insert(HabitCheckin).prefix_with('OR IGNORE').returning(HabitCheckin.id), checkin_rows
+            ).all()
+            checkins = len(inserted)
+            duplicates = len(checkin_rows) - len(inserted)
+        if habits or checkins:
+            invalidate_user(self.user_id)
+        db.session.commit()
+
+        self.refs.update(refs)
+        self.habits += habits
+        self.checkins += checkins
+        self.duplicates += duplicates
+
+    def finish(self):
+        # Streak counters, completion bitmaps and the daily rollup of the imported habits
+        from services.streakService import rebuild_streaks
+        from services.bitmapService import rebuild_bitmaps
+        from services.rollupService import rebuild_rollups
+        from services.cacheService import invalidate_user
+        from models import db
+
+        if self.refs:
+            habit_ids = [habit_id for habit_id, _ in self.refs.values()]
+            rebuild_streaks(habit_ids)
+            rebuild_bitmaps(habit_ids)
+            rebuild_rollups([self.user_id])
+            invalidate_user(self.user_id)
+            db.session.commit()
+
+    def summary(self):
+        return {
+            'complete': self.aborted is None,
+            'habits': self.habits,
+            'checkins': self.checkins,
+            'duplicates': self.duplicates,
+            'failed': self.failed,
+            'errors': self.errors,
+            **({'error': self.aborted} if self.aborted else {})
+        }
+
+def export_records(user_id, batch_size=1000):
+    # Yields the user's habits, then their check-ins, streamed from server-side
+    # cursors (yield_per) as plain column tuples
+    from models import db, Habit, HabitCheckin
+
+    habits = db.session.query(
+        Habit.id, Habit.name, Habit.frequency, Habit.category, Habit.start_date, Habit.target_duration, Habit.note
+    ).filter(Habit.user_id == user_id).order_by(Habit.id)
+    for habit_id, name, frequency, category, start_date, target_duration, note in habits.yield_per(batch_size):
+        yield {
+            'type': 'habit',
+            'ref': str(habit_id),
+            'name': name,
+            'frequency': frequency,
+            'category': category,
+            'start_date': start_date.date().isoformat(),
+            'target_duration': target_duration,
+            'note': note or ''
+        }
+
+    checkins = db.session.query(
+        HabitCheckin.habit_id, HabitCheckin.checkin_date, HabitCheckin.status, HabitCheckin.notes
+    ).join(Habit, HabitCheckin.habit_id == Habit.id).filter(
+        Habit.user_id == user_id
+    ).order_by(HabitCheckin.habit_id, HabitCheckin.checkin_date)
+    for habit_id, checkin_date, status, notes in checkins.yield_per(batch_size):
+        yield {
+            'type': 'checkin',
+            'ref': str(habit_id),
+            'date': checkin_date.date().isoformat(),
+            'status': status,
+            'notes': notes or ''
+        }
+
+def format_records(records, fmt, dumps=json.dumps, rows_per_chunk=500):
+    # Encodes records into text chunks of up to rows_per_chunk rows each
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=FIELDS, lineterminator='\n')
+        writer.writeheader()
+    rows = 0
+    for record in records:
+        if writer is not None:
+            writer.writerow(record)
+        else:
+            buffer.write(dumps(record))
+            buffer.write('\n')
+        rows += 1
+        if rows >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,107 @@
+import datetime
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def make_app(tmp_path):
+    # Apps built by one test share a temporary SQLite file, like worker processes.
+    # Each test gets fresh apps, and their sessions, engines and background
+    # threads are shut down afterwards so nothing carries over to the next test.
+    from app import create_app
+    from models import db
+    apps = []
+
+    def factory(**overrides):
+        config = {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'habithero.db'),
+            'CACHE_BACKEND': 'memory',
+            'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+            'NIGHTLY_JOBS_ENABLED': False,
+            'METRICS_ENABLED': False
+        }
+        config.update(overrides)
+        app = create_app(config)
+        apps.append(app)
+        return app
+    yield factory
+
+    for app in apps:
+        if 'habit_scheduler' in app.extensions:
+            app.extensions['habit_scheduler'].stop()
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        if 'habit_replica' in app.extensions:
+            app.extensions['habit_replica'].engine.dispose()
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def register(client, email='user@example.com'):
+    response = client.post('/api/auth/register', json={
+        'name': 'Test', 'email': email, 'password': 'secret1', 'confirmPassword': 'secret1'
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['user']['id']
+
+def days_ago(days):
+    return (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+
+def create_habit(client, name, frequency='daily', start=20, target_duration=60, category='health'):
+    response = client.post('/api/habits', json={
+        'name': name, 'frequency': frequency, 'category': category,
+        'start_date': days_ago(start), 'target_duration': target_duration
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['habit']['id']
+
+# The write paths keep daily_user_stats, completion bitmaps and streak counters
+# up to date incrementally; after each of them the stored state must equal a
+# full rebuild from habit_checkins.
+
+def derived_state(user_id):
+    from models import Habit, DailyUserStats
+    from services.bitmapService import completion_mask
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    rollup = {
+        row.date: (row.scheduled, row.completed, row.skipped)
+        for row in DailyUserStats.query.filter_by(user_id=user_id)
+        # Rows of deleted habits are decremented to zero rather than removed
+        if row.scheduled or row.completed or row.skipped
+    }
+    habits = {
+        habit.id: (
+            completion_mask(habit),
+            habit.longest_streak,
+            habit.last_completed_date,
+            # The nightly job zeroes streaks that missed a day; a rebuild doesn't
+            # store that, so compare the streak as it stands yesterday
+            habit.current_streak if habit.last_completed_date and habit.last_completed_date >= yesterday else 0
+        )
+        for habit in Habit.query.filter_by(user_id=user_id)
+    }
+    return rollup, habits
+
+def assert_matches_rebuild(app, user_id):
+    from models import db, Habit
+    from services.bitmapService import rebuild_bitmaps
+    from services.rollupService import rebuild_rollups
+    from services.streakService import rebuild_streaks
+    with app.app_context():
+        incremental = derived_state(user_id)
+        habit_ids = [habit_id for habit_id, in db.session.query(Habit.id).filter_by(user_id=user_id)]
+        rebuild_rollups([user_id])
+        rebuild_bitmaps(habit_ids)
+        rebuild_streaks(habit_ids)
+        db.session.expire_all()
+        assert incremental == derived_state(user_id)
@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from asgiref.wsgi import WsgiToAsgi
+
+def asgi_request(app, method, path, body=b'', headers=()):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'root_path': '', 'query_string': query.encode(),
+        'headers': [(name.encode(), value.encode()) for name, value in headers]
+                   + [(b'content-length', str(len(body)).encode())],
+        'server': ('localhost', 5000), 'client': ('127.0.0.1', 50000)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    status = sent[0]['status']
+    headers = {name.decode().lower(): value.decode() for name, value in sent[0]['headers']}
+    return status, headers, b''.join(message.get('body', b'') for message in sent[1:])
+
+def test_asgi_serves_the_same_json(app):
+    asgi_app = WsgiToAsgi(app)
+    status, _, body = asgi_request(asgi_app, 'GET', '/api/health')
+    assert status == 200
+    assert json.loads(body) == app.test_client().get('/api/health').get_json()
+
+    payload = json.dumps({'name': 'Test', 'email': 'user@example.com',
+                          'password': 'secret1', 'confirmPassword': 'secret1'}).encode()
+    status, headers, body = asgi_request(asgi_app, 'POST', '/api/auth/register', payload,
+                                         [('content-type', 'application/json')])
+    assert status == 201
+    assert json.loads(body)['user']['email'] == 'user@example.com'
+
+    cookie = headers['set-cookie'].split(';', 1)[0]
+    status, _, body = asgi_request(asgi_app, 'GET', '/api/auth/me', headers=[('cookie', cookie)])
+    assert status == 200
+    assert json.loads(body)['user']['email'] == 'user@example.com'
@@ -0,0 +1,39 @@
+import datetime
+from types import SimpleNamespace
+
+from conftest import create_habit, days_ago, register
+
+def test_window_counts_use_the_schedule():
+    from services.bitmapService import set_completed, window_counts
+    start = datetime.date(2024, 1, 1)
+    habit = SimpleNamespace(start_date=datetime.datetime(2024, 1, 1), frequency='weekly',
+                            target_duration=0, completion_bitmap=None)
+    for offset in (0, 7, 8):
+        set_completed(habit, start + datetime.timedelta(days=offset))
+    assert not set_completed(habit, start - datetime.timedelta(days=1))
+    # Due on days 0, 7 and 14; day 8 was completed but wasn't due
+    assert window_counts(habit, start, start + datetime.timedelta(days=14)) == (2, 3)
+    assert window_counts(habit, start + datetime.timedelta(days=1), start + datetime.timedelta(days=6)) == (0, 0)
+
+def test_check_bitmaps_finds_and_fixes_drift(app, client):
+    from models import db, Habit
+    from services.bitmapService import check_bitmaps, encode
+    register(client)
+    habit_id = create_habit(client, 'Run', start=5)
+    client.post('/api/habits/checkins/bulk', json={'checkins': [
+        {'habit_id': habit_id, 'date': days_ago(day)} for day in (4, 2)
+    ]})
+
+    with app.app_context():
+        assert check_bitmaps() == {}
+        db.session.get(Habit, habit_id).completion_bitmap = encode(0b1)
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['check-bitmaps'])
+    assert f'habit {habit_id}: 2 completion(s) missing from the bitmap' in result.output
+
+    with app.app_context():
+        missing, unexpected = check_bitmaps([habit_id], fix=True)[habit_id]
+        assert missing == [datetime.date.fromisoformat(days_ago(day)) for day in (4, 2)]
+        assert unexpected == [datetime.date.fromisoformat(days_ago(5))]
+        assert check_bitmaps() == {}
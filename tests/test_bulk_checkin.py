@@ -0,0 +1,52 @@
+from conftest import assert_matches_rebuild, create_habit, days_ago, register
+
+def bulk(client, checkins):
+    return client.post('/api/habits/checkins/bulk', json={'checkins': checkins})
+
+def test_bulk_checkin_matches_full_rebuild(app, client):
+    user_id = register(client)
+    daily = create_habit(client, 'Run')
+    weekly = create_habit(client, 'Review', frequency='weekly')
+    short = create_habit(client, 'Sprint', start=5, target_duration=3)
+
+    checkins = [{'habit_id': daily, 'date': days_ago(day)} for day in range(2, 9)]
+    checkins += [
+        {'habit_id': daily, 'date': days_ago(12), 'status': 'skipped'},
+        {'habit_id': weekly, 'date': days_ago(20)},
+        {'habit_id': weekly, 'date': days_ago(13)},
+        {'habit_id': short, 'date': days_ago(4)}
+    ]
+    response = bulk(client, checkins)
+    assert response.status_code == 200
+    assert response.get_json()['created'] == len(checkins)
+    assert_matches_rebuild(app, user_id)
+
+    # A late sync completes a day recorded as skipped; repeats are reported, not re-inserted
+    response = bulk(client, [{'habit_id': daily, 'date': days_ago(12)}, {'habit_id': daily, 'date': days_ago(2)}])
+    body = response.get_json()
+    assert (body['created'], body['updated'], body['duplicates']) == (0, 1, 1)
+    assert_matches_rebuild(app, user_id)
+
+def test_bulk_checkin_reports_invalid_items(client):
+    register(client)
+    habit_id = create_habit(client, 'Run')
+    other = register(client, 'other@example.com') and create_habit(client, 'Other')
+    client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'secret1'})
+
+    response = bulk(client, [
+        {'habit_id': habit_id},
+        {'habit_id': habit_id, 'date': days_ago(-1)},
+        {'habit_id': other},
+        {'habit_id': habit_id, 'date': days_ago(30)},
+        'not an object'
+    ])
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['created'], body['failed']) == (1, 4)
+    assert [result['status'] for result in body['results']] == ['created', 'invalid', 'not_found', 'invalid', 'invalid']
+
+def test_bulk_checkin_rejects_malformed_bodies(client):
+    register(client)
+    assert client.post('/api/habits/checkins/bulk', json=[{'habit_id': 1}]).status_code == 400
+    assert bulk(client, []).status_code == 400
+    assert bulk(client, {'habit_id': 1}).status_code == 400
@@ -0,0 +1,16 @@
+from conftest import create_habit, register
+
+def test_writes_invalidate_cached_views(client):
+    register(client)
+    habit_id = create_habit(client, 'Run')
+
+    def completed():
+        return client.get('/api/habits/analytics').get_json()['analytics']['completed_checkins']
+
+    assert completed() == 0
+    hits = client.get('/api/cache/stats').get_json()['cache']['hits']
+    assert completed() == 0
+    assert client.get('/api/cache/stats').get_json()['cache']['hits'] == hits + 1
+
+    client.post('/api/habits/mark-done', json={'habit_id': habit_id})
+    assert completed() == 1
@@ -0,0 +1,53 @@
+import datetime
+import time
+
+from conftest import create_habit, register
+
+def test_conditional_get(client):
+    register(client)
+    habit_id = create_habit(client, 'Run')
+
+    response = client.get('/api/habits/today')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    assert client.get('/api/habits/today', headers={'If-None-Match': etag}).status_code == 304
+    # Validators are per endpoint and query string
+    assert client.get('/api/habits', headers={'If-None-Match': etag}).status_code == 200
+
+    client.post('/api/habits/mark-done', json={'habit_id': habit_id})
+    response = client.get('/api/habits/today', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_validators_shared_between_workers(make_app):
+    # Two apps on one database stand in for two worker processes with their own memory caches
+    first, second = make_app().test_client(), make_app().test_client()
+    register(first)
+    second.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'secret1'})
+    habit_id = create_habit(first, 'Run')
+
+    etag = second.get('/api/habits/today').headers['ETag']
+    analytics = second.get('/api/habits/analytics').get_json()['analytics']
+    first.post('/api/habits/mark-done', json={'habit_id': habit_id})
+
+    assert second.get('/api/habits/today', headers={'If-None-Match': etag}).status_code == 200
+    assert second.get('/api/habits/analytics').get_json()['analytics'] != analytics
+
+def test_new_day_refreshes_cached_views_and_validators(client, monkeypatch):
+    register(client)
+    habit_id = create_habit(client, 'Run')
+    client.post('/api/habits/mark-done', json={'habit_id': habit_id})
+    response = client.get('/api/habits/analytics')
+    assert response.get_json()['analytics']['current_streak'] == 1
+    etag = response.headers['ETag']
+
+    # The user's midnight passes without a write
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    monkeypatch.setattr('controllers.habitController.user_today', lambda: tomorrow)
+    midnight = time.time() + 1
+    monkeypatch.setattr('services.timezoneService.day_start_timestamp', lambda name=None: midnight)
+
+    response = client.get('/api/habits/analytics', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['analytics']['current_streak'] == 0
+    assert client.get('/api/habits/analytics', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
@@ -0,0 +1,50 @@
+import datetime
+
+from conftest import create_habit, days_ago, register
+
+TODAY = datetime.date.today()
+
+def heatmap(client, query=''):
+    return client.get(f'/api/habits/calendar?mode=heatmap{query}')
+
+def test_heatmap_counts_completed_days_in_range(client):
+    register(client)
+    run, read = create_habit(client, 'Run'), create_habit(client, 'Read')
+    client.post('/api/habits/checkins/bulk', json={'checkins': [
+        {'habit_id': run, 'date': days_ago(1)},
+        {'habit_id': read, 'date': days_ago(1)},
+        {'habit_id': run, 'date': days_ago(3)},
+        {'habit_id': read, 'date': days_ago(4), 'status': 'skipped'},
+        {'habit_id': run, 'date': days_ago(10)}
+    ]})
+
+    body = heatmap(client).get_json()['heatmap']
+    assert (body['from'], body['to']) == ((TODAY - datetime.timedelta(days=364)).isoformat(), TODAY.isoformat())
+    assert body['dates'] == [days_ago(10), days_ago(3), days_ago(1)]
+    assert body['counts'] == [1, 1, 2]
+    assert body['total'] == 4
+
+    body = heatmap(client, f'&from={days_ago(5)}&to={days_ago(1)}&by_habit=true').get_json()['heatmap']
+    assert body['dates'] == [days_ago(3), days_ago(1)]
+    assert body['habits'] == [
+        {'id': run, 'name': 'Run', 'dates': [days_ago(3), days_ago(1)]},
+        {'id': read, 'name': 'Read', 'dates': [days_ago(1)]}
+    ]
+
+def test_heatmap_ranges_reaching_past_today(client):
+    register(client)
+    habit_id = create_habit(client, 'Run')
+    client.post('/api/habits/mark-done', json={'habit_id': habit_id})
+    future = (TODAY + datetime.timedelta(days=30)).isoformat()
+    body = heatmap(client, f'&from={days_ago(2)}&to={future}').get_json()['heatmap']
+    assert (body['to'], body['dates'], body['total']) == (future, [TODAY.isoformat()], 1)
+
+def test_heatmap_rejects_bad_ranges(client):
+    register(client)
+    longest = (TODAY - datetime.timedelta(days=5 * 366 - 1)).isoformat()
+    assert heatmap(client, f'&from={longest}').status_code == 200
+    for query in (f'&from={days_ago(5 * 366)}', f'&from={days_ago(1)}&to={days_ago(2)}',
+                  '&from=2024-02-30', f'&from={days_ago(-1)}'):
+        response = heatmap(client, query)
+        assert response.status_code == 400, query
+        assert not response.get_json()['success']
@@ -0,0 +1,42 @@
+from conftest import create_habit, register
+
+def scrape(client):
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    samples = {}
+    for line in response.data.decode().splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+def test_metrics_count_requests_and_queries(make_app):
+    client = make_app(METRICS_ENABLED=True, SLOW_QUERY_MS=1000).test_client()
+    register(client)
+    create_habit(client, 'Run')
+    client.get('/api/habits/analytics')
+    client.get('/api/habits/analytics')
+
+    samples = scrape(client)
+    endpoint = 'habits.get_user_analytics'
+    assert samples[f'habithero_http_requests_total{{endpoint="{endpoint}",method="GET",status="200"}}'] == 2
+    assert samples[f'habithero_request_duration_seconds_count{{endpoint="{endpoint}"}}'] == 2
+    assert samples[f'habithero_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}}'] == 2
+    assert samples[f'habithero_db_queries_total{{endpoint="{endpoint}"}}'] > 0
+    assert samples[f'habithero_slow_queries_total{{endpoint="{endpoint}"}}'] == 0
+    # The second request was served from the analytics cache
+    assert samples['habithero_cache_hits_total'] >= 1
+
+def test_slow_queries_and_repeated_statements_are_flagged(make_app, caplog):
+    client = make_app(METRICS_ENABLED=True, SLOW_QUERY_MS=0, N_PLUS_ONE_THRESHOLD=0).test_client()
+    register(client)
+    client.get('/api/habits')
+
+    samples = scrape(client)
+    assert samples['habithero_slow_queries_total{endpoint="habits.get_user_habits"}'] > 0
+    assert samples['habithero_n_plus_one_total{endpoint="habits.get_user_habits"}'] == 1
+    assert any(record.message.startswith('Slow query') for record in caplog.records)
+
+def test_metrics_route_is_off_unless_enabled(client):
+    assert client.get('/api/metrics').status_code == 404
@@ -0,0 +1,48 @@
+import datetime
+
+from conftest import assert_matches_rebuild, create_habit, days_ago, register
+
+TODAY = datetime.date.today()
+
+def test_nightly_records_missed_days(app, client):
+    from models import db, Habit, HabitCheckin
+    from services.nightlyService import run_nightly
+    user_id = register(client)
+    daily = create_habit(client, 'Run', start=5)
+    weekly = create_habit(client, 'Review', frequency='weekly', start=14)
+    client.post('/api/habits/checkins/bulk', json={'checkins': [
+        {'habit_id': daily, 'date': days_ago(3)},
+        {'habit_id': daily, 'date': days_ago(2)},
+        {'habit_id': weekly, 'date': days_ago(14)}
+    ]})
+
+    with app.app_context():
+        summary = run_nightly(through=TODAY - datetime.timedelta(days=1), since=TODAY - datetime.timedelta(days=14))
+        skipped = {(habit_id, checkin_date.date()) for habit_id, checkin_date in HabitCheckin.query.filter_by(
+            status='skipped').with_entities(HabitCheckin.habit_id, HabitCheckin.checkin_date)}
+        assert db.session.get(Habit, daily).current_streak == 0
+    assert summary['skipped_rows'] == 4
+    assert summary['streaks_reset'] == 1
+    assert skipped == {
+        (daily, TODAY - datetime.timedelta(days=5)),
+        (daily, TODAY - datetime.timedelta(days=4)),
+        (daily, TODAY - datetime.timedelta(days=1)),
+        (weekly, TODAY - datetime.timedelta(days=7))
+    }
+    assert_matches_rebuild(app, user_id)
+
+    # A late sync completes a day the nightly job recorded as skipped
+    response = client.post('/api/habits/checkins/bulk', json={'checkins': [{'habit_id': daily, 'date': days_ago(1)}]})
+    assert response.get_json()['updated'] == 1
+    assert_matches_rebuild(app, user_id)
+
+def test_nightly_processes_each_day_once(app, client):
+    from services.nightlyService import run_nightly
+    register(client)
+    create_habit(client, 'Run', start=5)
+
+    with app.app_context():
+        first = run_nightly()
+        assert first['from'] == first['through']
+        assert first['skipped_rows'] == 1
+        assert run_nightly() is None
@@ -0,0 +1,55 @@
+import json
+
+from conftest import create_habit, days_ago, register
+
+def walk(client, path, key, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        url = f'{path}?limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url).get_json()
+        items += body[key]
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            return items, pages
+
+def ndjson(client, path):
+    response = client.get(f'{path}?format=ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.data.decode().splitlines()]
+
+def test_habit_pages_follow_the_keyset(client):
+    register(client)
+    ids = [create_habit(client, f'Habit {index}') for index in range(5)]
+
+    habits, pages = walk(client, '/api/habits', 'habits', 2)
+    assert [habit['id'] for habit in habits] == ids
+    assert pages == 3
+    assert habits == client.get('/api/habits').get_json()['habits']
+    assert ndjson(client, '/api/habits') == habits
+
+def test_checkin_pages_are_newest_first_without_gaps(client):
+    register(client)
+    first, second = create_habit(client, 'Run'), create_habit(client, 'Read')
+    # Same-day check-ins of two habits share a checkin_date, so pages split on the id tie-breaker
+    client.post('/api/habits/checkins/bulk', json={'checkins': [
+        {'habit_id': habit_id, 'date': days_ago(day)} for day in range(4) for habit_id in (first, second)
+    ]})
+
+    checkins, pages = walk(client, '/api/habits/checkins', 'checkins', 3)
+    assert len(checkins) == 8 and len({checkin['id'] for checkin in checkins}) == 8
+    assert pages == 3
+    keys = [(checkin['checkin_date'], checkin['id']) for checkin in checkins]
+    assert keys == sorted(keys, reverse=True)
+    assert ndjson(client, '/api/habits/checkins') == checkins
+
+    # A newer check-in doesn't shift the pages a client is part-way through
+    cursor = client.get('/api/habits/checkins?limit=3').get_json()['next_cursor']
+    client.post('/api/habits/mark-done', json={'habit_id': create_habit(client, 'Write')})
+    assert client.get(f'/api/habits/checkins?limit=3&cursor={cursor}').get_json()['checkins'] == checkins[3:6]
+
+def test_bad_page_arguments_are_rejected(client):
+    register(client)
+    for query in ('limit=0', 'limit=501', 'cursor=not-a-cursor', 'cursor=WyJ4Il0'):
+        assert client.get(f'/api/habits?{query}').status_code == 400
+        assert client.get(f'/api/habits/checkins?{query}').status_code == 400
@@ -0,0 +1,54 @@
+import threading
+import time
+
+from conftest import register
+
+def stored_hash(app):
+    from models import User
+    with app.app_context():
+        return User.query.filter_by(email='user@example.com').one().password_hash
+
+def login(client):
+    return client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'secret1'})
+
+def test_saturated_pool_returns_503(make_app):
+    from services.passwordService import password_pool
+    app = make_app(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0, PASSWORD_HASH_QUEUE_TIMEOUT=0.01)
+    client = app.test_client()
+    register(client)
+
+    with app.app_context():
+        pool = password_pool()
+    started = threading.Event()
+
+    def slow_hash():
+        started.set()
+        time.sleep(0.5)
+
+    worker = threading.Thread(target=pool.run, args=(slow_hash,))
+    worker.start()
+    started.wait()
+    response = login(client)
+    worker.join()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert login(client).status_code == 200
+
+def test_login_upgrades_hashes_of_an_older_cost(make_app, monkeypatch):
+    from services.passwordService import HashingBusy, HashingPool
+    register(make_app().test_client())
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:2000')
+    client = app.test_client()
+
+    # A saturated pool after the password was verified only postpones the upgrade
+    def busy(self):
+        raise HashingBusy('Password hashing pool is saturated')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(HashingPool, 'method_prefix', busy)
+        assert login(client).status_code == 200
+    assert stored_hash(app).startswith('pbkdf2:sha256:1000$')
+
+    assert login(client).status_code == 200
+    assert stored_hash(app).startswith('pbkdf2:sha256:2000$')
@@ -0,0 +1,53 @@
+import datetime
+import time
+
+from conftest import create_habit, register
+
+def replica_config(tmp_path):
+    return {'READ_REPLICA_URL': 'sqlite:///' + str(tmp_path / 'replica.db')}
+
+def test_replica_read_your_writes_across_workers(make_app, tmp_path):
+    from services.replicaService import should_use_replica, sync_replica
+    writer_app, reader_app = make_app(**replica_config(tmp_path)), make_app(**replica_config(tmp_path))
+    writer = writer_app.test_client()
+    user_id = register(writer)
+    habit_id = create_habit(writer, 'Run')
+
+    with writer_app.app_context():
+        sync_replica()
+    with reader_app.test_request_context():
+        assert should_use_replica('analytics', user_id)
+
+    writer.post('/api/habits/mark-done', json={'habit_id': habit_id})
+    with reader_app.test_request_context():
+        assert not should_use_replica('analytics', user_id)
+
+def test_rollup_rows_materialized_in_a_replica_view(make_app, tmp_path, monkeypatch):
+    from services.replicaService import sync_replica
+    app = make_app(**replica_config(tmp_path))
+    client = app.test_client()
+    register(client)
+    create_habit(client, 'Run')
+    with app.app_context():
+        sync_replica()
+
+    # A new day: daily-success materializes its row on the primary, which the
+    # replica doesn't have until the next sync
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    midnight = time.time() + 1
+    monkeypatch.setattr('controllers.habitController.user_today', lambda: tomorrow)
+    monkeypatch.setattr('services.timezoneService.day_start_timestamp', lambda name=None: midnight)
+
+    data = client.get('/api/habits/daily-success').get_json()['data']
+    assert data[-1]['date'] == tomorrow.isoformat()
+    assert data[-1]['total'] == 1
+
+def test_replica_does_not_leak_into_other_apps(make_app, tmp_path):
+    from models import db
+    make_app(**replica_config(tmp_path))
+    app = make_app()
+    assert 'habit_replica' not in app.extensions
+    assert not app.config.get('SQLALCHEMY_BINDS')
+    with app.app_context():
+        assert list(db.engines) == [None]
+    register(app.test_client())
@@ -0,0 +1,29 @@
+import datetime
+
+from conftest import assert_matches_rebuild, create_habit, register
+
+def test_rollup_follows_habit_and_checkin_writes(app, client):
+    user_id = register(client)
+    daily = create_habit(client, 'Run')
+    weekly = create_habit(client, 'Review', frequency='weekly')
+    create_habit(client, 'Sprint', start=5, target_duration=3)
+    assert_matches_rebuild(app, user_id)
+
+    assert client.post('/api/habits/mark-done', json={'habit_id': daily}).status_code == 200
+    assert_matches_rebuild(app, user_id)
+
+    assert client.delete(f'/api/habits?habit_id={weekly}').status_code == 200
+    assert_matches_rebuild(app, user_id)
+
+def test_daily_success_reads_the_rollup(app, client):
+    from models import DailyUserStats
+    user_id = register(client)
+    habit_id = create_habit(client, 'Run', start=3)
+    create_habit(client, 'Sprint', start=1, target_duration=1)
+    client.post('/api/habits/mark-done', json={'habit_id': habit_id})
+
+    days = client.get('/api/habits/daily-success').get_json()['data']
+    assert [(day['completed'], day['total']) for day in days] == [(0, 0)] * 3 + [(0, 1), (0, 1), (0, 2), (1, 1)]
+    with app.app_context():
+        assert DailyUserStats.query.filter_by(user_id=user_id).count() == 4
+        assert DailyUserStats.query.filter_by(user_id=user_id, date=datetime.date.today()).one().completed == 1
@@ -0,0 +1,32 @@
+import datetime
+
+from conftest import assert_matches_rebuild, create_habit, days_ago, register
+
+def test_compute_streak_counters():
+    from services.streakService import compute_streak_counters
+    day = datetime.date(2024, 3, 1)
+    dates = [day + datetime.timedelta(days=offset) for offset in (0, 1, 2, 5, 6)]
+    assert compute_streak_counters(dates) == (2, 3, dates[-1])
+    assert compute_streak_counters([]) == (0, 0, None)
+
+def streak(client):
+    habit = client.get('/api/habits/today').get_json()['habits'][0]
+    return habit['current_streak']
+
+def test_counters_follow_in_order_and_late_completions(app, client):
+    from models import db, Habit
+    user_id = register(client)
+    habit_id = create_habit(client, 'Run')
+
+    client.post('/api/habits/checkins/bulk', json={'checkins': [
+        {'habit_id': habit_id, 'date': days_ago(day)} for day in (5, 4, 3, 1)
+    ]})
+    client.post('/api/habits/mark-done', json={'habit_id': habit_id})
+    assert streak(client) == 2
+    with app.app_context():
+        assert db.session.get(Habit, habit_id).longest_streak == 3
+
+    # A synced completion for an older day joins the two runs
+    client.post('/api/habits/checkins/bulk', json={'checkins': [{'habit_id': habit_id, 'date': days_ago(2)}]})
+    assert streak(client) == 6
+    assert_matches_rebuild(app, user_id)
@@ -0,0 +1,64 @@
+import datetime
+import zoneinfo
+
+from conftest import create_habit
+
+# Fixed offsets 26 hours apart, so their local dates always differ
+AHEAD, BEHIND = 'Etc/GMT-14', 'Etc/GMT+12'
+
+def local_today(name):
+    return datetime.datetime.now(zoneinfo.ZoneInfo(name)).date()
+
+def register_in(client, email, timezone):
+    response = client.post('/api/auth/register', json={
+        'name': 'Test', 'email': email, 'password': 'secret1', 'confirmPassword': 'secret1', 'timezone': timezone
+    })
+    assert response.status_code == 201, response.get_json()
+
+def checkin_days(client):
+    return [checkin['checkin_date'][:10] for checkin in client.get('/api/habits/checkins').get_json()['checkins']]
+
+def test_check_ins_land_on_each_users_local_day(app):
+    ahead, behind = app.test_client(), app.test_client()
+    register_in(ahead, 'ahead@example.com', AHEAD)
+    register_in(behind, 'behind@example.com', BEHIND)
+    for client in (ahead, behind):
+        habit_id = create_habit(client, 'Run')
+        assert client.post('/api/habits/mark-done', json={'habit_id': habit_id}).status_code == 200
+
+    assert checkin_days(ahead) == [local_today(AHEAD).isoformat()]
+    assert checkin_days(behind) == [local_today(BEHIND).isoformat()]
+    for client, zone in ((ahead, AHEAD), (behind, BEHIND)):
+        assert client.get('/api/habits/daily-success').get_json()['data'][-1] == {
+            'date': local_today(zone).isoformat(), 'day': local_today(zone).strftime('%a'),
+            'success_rate': 100.0, 'completed': 1, 'total': 1
+        }
+        assert client.get('/api/habits/today').get_json()['habits'][0]['checked_in_today'] == 'completed'
+
+def test_future_dates_are_judged_in_the_users_zone(client):
+    register_in(client, 'ahead@example.com', AHEAD)
+    habit_id = create_habit(client, 'Run')
+    today = local_today(AHEAD)
+    response = client.post('/api/habits/checkins/bulk', json={'checkins': [
+        {'habit_id': habit_id, 'date': today.isoformat()},
+        {'habit_id': habit_id, 'date': (today + datetime.timedelta(days=1)).isoformat()}
+    ]})
+    assert [result['status'] for result in response.get_json()['results']] == ['created', 'invalid']
+
+def test_changing_timezone_moves_today(client):
+    register_in(client, 'user@example.com', AHEAD)
+    habit_id = create_habit(client, 'Run')
+    client.post('/api/habits/mark-done', json={'habit_id': habit_id})
+
+    assert client.patch('/api/auth/me', json={'timezone': 'Mars/Olympus_Mons'}).status_code == 400
+    assert client.patch('/api/auth/me', json={'timezone': BEHIND}).status_code == 200
+    # A different local day, so the habit is open again
+    assert client.get('/api/habits/today').get_json()['habits'][0]['checked_in_today'] == 'pending'
+    assert client.post('/api/habits/mark-done', json={'habit_id': habit_id}).status_code == 200
+    assert sorted(checkin_days(client)) == sorted([local_today(AHEAD).isoformat(), local_today(BEHIND).isoformat()])
+
+def test_day_start_timestamp_is_local_midnight():
+    from services.timezoneService import day_start_timestamp
+    for zone in (AHEAD, BEHIND, 'America/New_York'):
+        midnight = datetime.datetime.combine(local_today(zone), datetime.time(), zoneinfo.ZoneInfo(zone))
+        assert day_start_timestamp(zone) == midnight.timestamp()
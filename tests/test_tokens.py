@@ -0,0 +1,65 @@
+from conftest import create_habit
+
+def register_with_tokens(client):
+    response = client.post('/api/auth/register', json={
+        'name': 'Test', 'email': 'user@example.com', 'password': 'secret1', 'confirmPassword': 'secret1'
+    })
+    assert response.status_code == 201
+    return response.get_json()
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+def refresh(client, token):
+    return client.post('/api/auth/refresh', json={'refresh_token': token})
+
+def test_access_tokens_authenticate_without_a_session(make_app):
+    client = make_app(AUTH_MODE='token').test_client()
+    tokens = register_with_tokens(client)
+    assert tokens['token_type'] == 'Bearer'
+    assert client.get_cookie('session') is None
+
+    me = client.get('/api/auth/me', headers=bearer(tokens['access_token']))
+    assert me.get_json()['user']['email'] == 'user@example.com'
+    assert client.get('/api/auth/me').status_code == 401
+    assert client.get('/api/auth/me', headers=bearer(tokens['refresh_token'])).status_code == 401
+    assert client.get('/api/habits', headers=bearer(tokens['access_token'])).status_code == 200
+
+def test_refresh_tokens_are_single_use(make_app):
+    client = make_app(AUTH_MODE='token').test_client()
+    tokens = register_with_tokens(client)
+
+    response = refresh(client, tokens['refresh_token'])
+    assert response.status_code == 200
+    renewed = response.get_json()
+    assert client.get('/api/auth/me', headers=bearer(renewed['access_token'])).status_code == 200
+
+    response = refresh(client, tokens['refresh_token'])
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'Token revoked'
+    assert refresh(client, renewed['access_token']).status_code == 401
+    assert refresh(client, renewed['refresh_token']).status_code == 200
+
+def test_logout_revokes_tokens_in_every_worker(make_app):
+    first = make_app(AUTH_MODE='token').test_client()
+    second = make_app(AUTH_MODE='token', REVOCATION_SYNC_SECONDS=0).test_client()
+    tokens = register_with_tokens(first)
+    assert second.get('/api/auth/me', headers=bearer(tokens['access_token'])).status_code == 200
+
+    response = first.post('/api/auth/logout', json={'refresh_token': tokens['refresh_token']},
+                          headers=bearer(tokens['access_token']))
+    assert response.status_code == 200
+    for client in (first, second):
+        assert client.get('/api/auth/me', headers=bearer(tokens['access_token'])).status_code == 401
+    assert refresh(second, tokens['refresh_token']).status_code == 401
+
+def test_both_modes_accept_either_credential(make_app):
+    client = make_app(AUTH_MODE='both').test_client()
+    tokens = register_with_tokens(client)
+    habit_id = create_habit(client, 'Run')
+    # The habit was created over the session cookie and is listed over the token
+    habits = client.get('/api/habits', headers=bearer(tokens['access_token'])).get_json()['habits']
+    assert [habit['id'] for habit in habits] == [habit_id]
+
+def test_refresh_is_disabled_in_session_mode(client):
+    assert refresh(client, 'anything').status_code == 404
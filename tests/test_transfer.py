@@ -0,0 +1,89 @@
+import json
+
+from conftest import assert_matches_rebuild, create_habit, days_ago, register
+
+def ndjson(records):
+    return '\n'.join(map(json.dumps, records))
+
+def import_records(client, records, **kwargs):
+    return client.post('/api/habits/import', data=ndjson(records), content_type='application/x-ndjson', **kwargs)
+
+def habit_records(count, checkins=3):
+    records = []
+    for index in range(count):
+        records.append({'type': 'habit', 'ref': f'h{index}', 'name': f'Habit {index}', 'frequency': 'daily',
+                        'category': 'learning', 'start_date': days_ago(10), 'target_duration': 30})
+        records += [{'type': 'checkin', 'ref': f'h{index}', 'date': days_ago(day)} for day in range(checkins)]
+    return records
+
+def test_import_matches_full_rebuild(app, client):
+    user_id = register(client)
+    create_habit(client, 'Run')
+    records = habit_records(2)
+    records += [
+        {'type': 'checkin', 'ref': 'h0', 'date': days_ago(0)},
+        {'type': 'checkin', 'ref': 'missing', 'date': days_ago(0)},
+        {'type': 'habit', 'ref': 'bad', 'name': 'Bad', 'frequency': 'daily', 'category': 'learning',
+         'start_date': days_ago(1), 'target_duration': True}
+    ]
+    response = import_records(client, records)
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['success'] and body['complete']
+    assert (body['habits'], body['checkins'], body['duplicates'], body['failed']) == (2, 6, 1, 2)
+    assert_matches_rebuild(app, user_id)
+
+def test_export_round_trips_through_import(client):
+    register(client)
+    import_records(client, habit_records(2))
+    exported = client.get('/api/habits/export?format=csv')
+    assert exported.headers['Content-Type'].startswith('text/csv')
+
+    register(client, 'other@example.com')
+    response = client.post('/api/habits/import?format=csv', data=exported.data, content_type='text/csv')
+    assert (response.get_json()['habits'], response.get_json()['checkins']) == (2, 6)
+    lines = client.get('/api/habits/export').data.decode().splitlines()
+    assert [json.loads(line)['type'] for line in lines].count('checkin') == 6
+
+def test_failed_batch_reports_a_partial_import(make_app, monkeypatch):
+    from services.transferService import HabitImport
+    client = make_app(IMPORT_BATCH_SIZE=4).test_client()
+    register(client)
+    import_batch = HabitImport.import_batch
+
+    def failing_second_batch(self, batch):
+        if self.habits:
+            raise RuntimeError('disk I/O error')
+        return import_batch(self, batch)
+
+    monkeypatch.setattr(HabitImport, 'import_batch', failing_second_batch)
+    response = import_records(client, habit_records(2))
+    body = response.get_json()
+    assert response.status_code == 207
+    assert not body['success'] and not body['complete']
+    assert (body['habits'], body['checkins']) == (1, 3)
+    assert 'from line 5 on' in body['error']
+    assert len(client.get('/api/habits').get_json()['habits']) == 1
+
+def test_import_rejects_bad_uploads(client):
+    register(client)
+    response = client.post('/api/habits/import', data=b'{}', content_type='text/plain')
+    assert response.status_code == 400
+    response = client.post('/api/habits/import', data=ndjson(habit_records(1)).encode() + b'\n\xff\xfe',
+                           content_type='application/x-ndjson')
+    body = response.get_json()
+    assert response.status_code == 400
+    assert not body['success'] and not body['complete']
+    assert 'invalid file encoding' in body['error']
+
+def test_export_errors_are_reported(client, monkeypatch):
+    register(client)
+
+    def broken_export(user_id, batch_size):
+        raise RuntimeError('database disk image is malformed')
+        yield
+
+    monkeypatch.setattr('controllers.habitController.export_records', broken_export)
+    response = client.get('/api/habits/export')
+    assert response.status_code == 500
+    assert not response.get_json()['success']